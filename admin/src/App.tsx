@@ -11,7 +11,7 @@ import ProtectedRoute from './components/auth/ProtectedRoute';
 import { FightProvider } from './context/FightContext';
 import { AuthProvider, useAuth } from './context/AuthContext';
 import { useTranslation } from './hooks/useTranslation';
-import api from './services/api';
+import api, { applyCardDiff } from './services/api';
 import type { Fight } from './services/api';
 import './App.css';
 
@@ -60,8 +60,8 @@ function AdminPanel() {
     try {
       const fightId = fights[result.source.index].id;
       const newPosition = result.destination.index + 1;
-      const updatedFights = await api.updateFightNumber(fightId, newPosition);
-      setFights(updatedFights);
+      const diff = await api.updateFightNumberDelta(fightId, newPosition);
+      setFights((current) => applyCardDiff(current, diff));
     } catch (error) {
       console.error('Error updating fight order:', error);
     }
@@ -82,8 +82,8 @@ function AdminPanel() {
 
   const handleRefreshTimes = async () => {
     try {
-      const updatedFights = await api.refreshFightTimes();
-      setFights(updatedFights);
+      const diff = await api.refreshFightTimesDelta();
+      setFights((current) => applyCardDiff(current, diff));
     } catch (error) {
       console.error('Error refreshing fight times:', error);
     }
@@ -34,7 +34,7 @@ import {
   SwapVert as SwapVertIcon
 } from '@mui/icons-material';
 import type { Fight, FightCreate } from '../services/api';
-import api from '../services/api';
+import api, { applyCardDiff } from '../services/api';
 import { useFightContext } from '../context/FightContext';
 import { useTranslation } from '../hooks/useTranslation';
 import { alpha } from '@mui/material/styles';
@@ -160,13 +160,21 @@ const FightList: React.FC<FightListProps> = ({ fights = [], onDragEnd, onDelete,
     // Initial load
     loadFights(true);
 
-    // Set up auto-refresh if enabled
+    // Reload whenever the live feed reports a card change
+    const unsubscribe = api.subscribeToCardEvents(() => loadFights());
+
+    // Set up auto-refresh if enabled, used only while the live feed is down
     let interval: number | null = null;
     if (AUTO_REFRESH_ENABLED) {
-      interval = window.setInterval(() => loadFights(), REFRESH_INTERVAL);
+      interval = window.setInterval(() => {
+        if (!api.isLiveFeedConnected()) {
+          loadFights();
+        }
+      }, REFRESH_INTERVAL);
     }
 
     return () => {
+      unsubscribe();
       if (interval) {
         window.clearInterval(interval);
       }
@@ -232,8 +240,8 @@ const FightList: React.FC<FightListProps> = ({ fights = [], onDragEnd, onDelete,
 
   const handleUpdateFightNumber = async (fightId: string, newNumber: number) => {
     try {
-      const updatedFights = await api.updateFightNumber(fightId, newNumber);
-      setFightsState(updatedFights);
+      const diff = await api.updateFightNumberDelta(fightId, newNumber);
+      setFightsState((current) => applyCardDiff(current, diff));
       setEditFightNumber(null);
       setError(null);
       onUpdate?.();
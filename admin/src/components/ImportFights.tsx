@@ -261,10 +261,21 @@ const ImportFights: React.FC = () => {
 
     try {
       const result = await api.importFights(file);
-      setMessage({
-        type: 'success',
-        text: `Successfully imported ${result.imported} fights`,
-      });
+      if (result.rejected > 0) {
+        const details = result.errors
+          .slice(0, 5)
+          .map((rowError) => `line ${rowError.row}: ${rowError.error}`)
+          .join('; ');
+        setMessage({
+          type: 'error',
+          text: `Imported ${result.imported} fights, ${result.rejected} rows rejected (${details})`,
+        });
+      } else {
+        setMessage({
+          type: 'success',
+          text: `Successfully imported ${result.imported} fights`,
+        });
+      }
     } catch (error: any) {
       console.error('Import error:', error);
       const errorDetail = error.response?.data?.detail;
@@ -1,88 +1,20 @@
-import React, { useCallback, useMemo } from 'react';
+import React, { useMemo } from 'react';
 import { Typography, Box, Stack, useTheme, useMediaQuery, CircularProgress, Alert } from '@mui/material';
 import { useFightContext } from '../../context/FightContext';
 import { useTranslation } from '../../hooks/useTranslation';
 import FightCard from './FightCard';
-import type { Fight } from '../../services/api';
-import api from '../../services/api';
 
 const CurrentFights: React.FC = () => {
-  const { ongoingFight, readyFight } = useFightContext();
+  const { ongoingFight, readyFight, nextFights, lastUpdate, statusError } = useFightContext();
   const { t } = useTranslation();
   const theme = useTheme();
   const isMobile = useMediaQuery(theme.breakpoints.down('sm'));
-  const [nextFights, setNextFights] = React.useState<Fight[]>([]);
-  const [error, setError] = React.useState<string | null>(null);
-  const [isLoading, setIsLoading] = React.useState(true);
-  const [lastUpdate, setLastUpdate] = React.useState<Date | null>(null);
 
-  // Use useRef to store the timer interval
-  const intervalRef = React.useRef<number | null>(null);
-
-  React.useEffect(() => {
-    let isMounted = true;
-
-    const loadNextFights = async () => {
-      if (!isMounted) return;
-
-      try {
-        setIsLoading(true);
-        setError(null);
-        const fights = await api.getNextFights(100);
-
-        if (isMounted) {
-          setNextFights(fights);
-          setLastUpdate(new Date());
-        }
-      } catch (error) {
-        console.error('Error loading next fights:', error);
-        if (isMounted) {
-          setError('Erreur lors du chargement des prochains combats. Veuillez réessayer plus tard.');
-        }
-      } finally {
-        if (isMounted) {
-          setIsLoading(false);
-        }
-      }
-    };
-
-    // Initial load
-    loadNextFights();
-
-    // Set up interval
-    if (intervalRef.current) {
-      clearInterval(intervalRef.current);
-    }
-
-    intervalRef.current = setInterval(() => {
-      if (isMounted) {
-        loadNextFights();
-      }
-    }, 60000);
-
-    return () => {
-      isMounted = false;
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current);
-        intervalRef.current = null;
-      }
-    };
-  }, []); // No dependencies to prevent recreation
-
-  const handleManualRefresh = useCallback(async () => {
-    try {
-      setIsLoading(true);
-      setError(null);
-      const fights = await api.getNextFights(100);
-      setNextFights(fights);
-      setLastUpdate(new Date());
-    } catch (error) {
-      console.error('Manual refresh - Error loading next fights:', error);
-      setError('Erreur lors du chargement des prochains combats. Veuillez réessayer plus tard.');
-    } finally {
-      setIsLoading(false);
-    }
-  }, []);
+  // The fight context loads the whole card state, including the next fights
+  const isLoading = lastUpdate === null && !statusError;
+  const error = statusError && nextFights.length === 0
+    ? 'Erreur lors du chargement des prochains combats. Veuillez réessayer plus tard.'
+    : null;
 
   const SectionTitle: React.FC<{ title: string; highlight?: boolean }> = React.memo(({ title, highlight }) => (
     <Typography
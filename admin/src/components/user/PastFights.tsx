@@ -2,33 +2,15 @@ import React from 'react';
 import { Typography, Box, Stack, useTheme, useMediaQuery } from '@mui/material';
 import { useTranslation } from '../../hooks/useTranslation';
 import FightCard from './FightCard';
-import type { Fight } from '../../services/api';
-import api from '../../services/api';
+import { useFightContext } from '../../context/FightContext';
 
 const PastFights: React.FC = () => {
   const { t } = useTranslation();
   const theme = useTheme();
   const isMobile = useMediaQuery(theme.breakpoints.down('sm'));
-  const [pastFights, setPastFights] = React.useState<Fight[]>([]);
-  const [error, setError] = React.useState<string | null>(null);
-
-  React.useEffect(() => {
-    const loadPastFights = async () => {
-      try {
-        const fights = await api.getPastFights();
-        setPastFights(fights);
-      } catch (error) {
-        console.error('Error loading past fights:', error);
-        setError(t('pastFights.errorLoading'));
-      }
-    };
-
-    loadPastFights();
-
-    // Refresh every minute
-    const interval = setInterval(loadPastFights, 60000);
-    return () => clearInterval(interval);
-  }, [t]);
+  // The fight context loads the whole card state, including the past fights
+  const { pastFights, statusError } = useFightContext();
+  const error = statusError && pastFights.length === 0 ? t('pastFights.errorLoading') : null;
 
   return (
     <Box sx={{ maxWidth: 800, mx: 'auto', p: 2 }}>
@@ -5,9 +5,17 @@ import api from '../services/api';
 interface FightContextType {
   ongoingFight: Fight | null;
   readyFight: Fight | null;
+  nextFights: Fight[];
+  pastFights: Fight[];
+  lastUpdate: Date | null;
+  statusError: boolean;
   refreshFightStatus: () => Promise<void>;
 }
 
+// Number of upcoming and completed fights shown on the spectator pages
+const NEXT_FIGHTS_LIMIT = 100;
+const PAST_FIGHTS_LIMIT = 10;
+
 const FightContext = createContext<FightContextType | null>(null);
 
 export const useFightContext = () => {
@@ -21,17 +29,23 @@ export const useFightContext = () => {
 export const FightProvider: React.FC<{ children: React.ReactNode }> = ({ children }) => {
   const [ongoingFight, setOngoingFight] = useState<Fight | null>(null);
   const [readyFight, setReadyFight] = useState<Fight | null>(null);
+  const [nextFights, setNextFights] = useState<Fight[]>([]);
+  const [pastFights, setPastFights] = useState<Fight[]>([]);
+  const [lastUpdate, setLastUpdate] = useState<Date | null>(null);
+  const [statusError, setStatusError] = useState(false);
 
   const refreshFightStatus = useCallback(async () => {
     try {
-      const [ongoing, ready] = await Promise.all([
-        api.getOngoingFight(),
-        api.getReadyFight()
-      ]);
-      setOngoingFight(ongoing);
-      setReadyFight(ready);
+      const state = await api.getCardState(NEXT_FIGHTS_LIMIT, PAST_FIGHTS_LIMIT);
+      setOngoingFight(state.ongoing);
+      setReadyFight(state.ready);
+      setNextFights(state.next);
+      setPastFights(state.past);
+      setLastUpdate(new Date());
+      setStatusError(false);
     } catch (error) {
       console.error('Error refreshing fight status:', error);
+      setStatusError(true);
     }
   }, []);
 
@@ -47,15 +61,21 @@ export const FightProvider: React.FC<{ children: React.ReactNode }> = ({ childre
     // Initial load
     loadData();
 
-    // Refresh every 60 seconds (increased from 30)
+    // Refresh whenever the live feed reports a card change
+    const unsubscribe = api.subscribeToCardEvents(() => {
+      loadData();
+    });
+
+    // Fall back to polling every 60 seconds while the live feed is down
     const interval = window.setInterval(() => {
-      if (isMounted) {
+      if (isMounted && !api.isLiveFeedConnected()) {
         loadData();
       }
     }, 60000);
 
     return () => {
       isMounted = false;
+      unsubscribe();
       window.clearInterval(interval);
     };
   }, []); // No dependencies to prevent recreation
@@ -63,8 +83,12 @@ export const FightProvider: React.FC<{ children: React.ReactNode }> = ({ childre
   const contextValue = useMemo(() => ({
     ongoingFight,
     readyFight,
+    nextFights,
+    pastFights,
+    lastUpdate,
+    statusError,
     refreshFightStatus
-  }), [ongoingFight, readyFight, refreshFightStatus]);
+  }), [ongoingFight, readyFight, nextFights, pastFights, lastUpdate, statusError, refreshFightStatus]);
 
   return (
     <FightContext.Provider value={contextValue}>
@@ -2,6 +2,12 @@ import axios from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// Ring of the event this admin drives, the backend's default ring when unset
+const CARD_PARTITION: Record<string, string> = {
+  ...(import.meta.env.VITE_EVENT_ID ? { event_id: import.meta.env.VITE_EVENT_ID } : {}),
+  ...(import.meta.env.VITE_RING_ID ? { ring_id: import.meta.env.VITE_RING_ID } : {}),
+};
+
 // Configure axios defaults
 axios.defaults.headers.common['Accept'] = 'application/json';
 
@@ -11,11 +17,52 @@ axios.interceptors.request.use((config) => {
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  // Every card request is scoped to the configured ring
+  if (config.url?.startsWith(`${API_URL}/fights`)) {
+    config.params = { ...CARD_PARTITION, ...config.params };
+  }
   return config;
 });
 
+// Static copy of the card state written by the backend and served by nginx
+// (e.g. /public/state.json), read by the spectator pages instead of the API when set.
+// The backend writes the default ring to state.json and every ring to
+// <event_id>/<ring_id>/state.json next to it; unset ids are the backend's
+// default DEFAULT_EVENT_ID / DEFAULT_RING_ID.
+const publicStateUrl = (url: string | undefined): string | undefined => {
+  if (!url || !(CARD_PARTITION.event_id || CARD_PARTITION.ring_id)) return url;
+  const eventId = encodeURIComponent(CARD_PARTITION.event_id ?? 'default');
+  const ringId = encodeURIComponent(CARD_PARTITION.ring_id ?? '1');
+  return url.replace(/state\.json$/, `${eventId}/${ringId}/state.json`);
+};
+const PUBLIC_STATE_URL = publicStateUrl(import.meta.env.VITE_PUBLIC_STATE_URL);
+
+// Conditional GETs: remember the last ETag and payload per URL so unchanged
+// polls are answered with an empty 304 Not Modified
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
+const getWithETag = async <T>(url: string): Promise<T> => {
+  const cached = etagCache.get(url);
+  const response = await axios.get(url, {
+    headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+
+  if (response.status === 304 && cached) {
+    return cached.data as T;
+  }
+
+  const etag = response.headers['etag'];
+  if (etag) {
+    etagCache.set(url, { etag, data: response.data });
+  }
+  return response.data;
+};
+
 export interface Fight {
   id: string;
+  event_id: string;
+  ring_id: string;
   fight_number: number;
   fighter_a: string;
   fighter_a_club: string;
@@ -33,6 +80,19 @@ export interface Fight {
   is_completed: boolean;
 }
 
+export interface CardState {
+  ongoing: Fight | null;
+  ready: Fight | null;
+  next: Fight[];
+  past: Fight[];
+}
+
+export interface ImportReport {
+  imported: number;
+  rejected: number;
+  errors: { row: number; error: string }[];
+}
+
 export interface FightCreate {
   fighter_a: string;
   fighter_a_club: string;
@@ -59,7 +119,135 @@ export interface FightUpdate {
   is_completed?: boolean;
 }
 
+// Fights added or modified by a mutation, and the ids of the removed ones
+export interface CardDiff {
+  version: number;
+  changed: Fight[];
+  removed: string[];
+}
+
+// Apply a delta response to a local copy of the card, in card order (fight
+// number) like the full renumber response: completed and ongoing fights keep
+// their original expected start, so it doesn't follow the card order
+export const applyCardDiff = (fights: Fight[], diff: CardDiff): Fight[] => {
+  const removed = new Set(diff.removed);
+  const changed = new Map(diff.changed.map((fight) => [fight.id, fight]));
+  const merged = fights
+    .filter((fight) => !removed.has(fight.id))
+    .map((fight) => changed.get(fight.id) ?? fight);
+  const known = new Set(merged.map((fight) => fight.id));
+  diff.changed.forEach((fight) => {
+    if (!known.has(fight.id)) merged.push(fight);
+  });
+  return merged.sort((a, b) => a.fight_number - b.fight_number);
+};
+
+export type FightOperation =
+  | { op: 'move'; fight_id: string; new_number: number }
+  | { op: 'patch'; fight_id: string; changes: FightUpdate }
+  | { op: 'cancel'; fight_id: string }
+  | { op: 'delete'; fight_id: string }
+  | { op: 'add'; fight: FightCreate };
+
+export interface FightForecast {
+  id: string;
+  fight_number: number;
+  fighter_a: string;
+  fighter_b: string;
+  fight_type: string;
+  scheduled_start: string | null;
+  expected_start: string;
+  p90_start: string;
+}
+
+export interface CardForecast {
+  generated_at: string;
+  fights: FightForecast[];
+  stats: {
+    fight_type: string;
+    overrun_samples: number;
+    overrun_mean: number;
+    overrun_std: number;
+    changeover_samples: number;
+    changeover_mean: number;
+    changeover_std: number;
+  }[];
+}
+
+export interface FightRecord {
+  id: string;
+  event_id: string;
+  ring_id: string;
+  fight_number: number;
+  fighter_a: string;
+  fighter_a_club: string;
+  fighter_b: string;
+  fighter_b_club: string;
+  weight_class: number;
+  fight_type: string;
+  nb_rounds: number;
+  duration: number;
+  actual_start: string;
+  actual_end: string;
+  archived_at: string;
+}
+
+export interface HistoryPage {
+  items: FightRecord[];
+  next_cursor: string | null;
+}
+
+export interface CardEvent {
+  version: number;
+  reason: string | null;
+  event_id?: string;
+  ring_id?: string;
+}
+
+// Live feed: a single EventSource shared by every subscriber of the page
+type CardEventListener = (event: CardEvent) => void;
+const cardEventListeners = new Set<CardEventListener>();
+let cardEventSource: EventSource | null = null;
+let liveFeedConnected = false;
+
+const openCardEventSource = () => {
+  if (cardEventSource || typeof EventSource === 'undefined') return;
+
+  cardEventSource = new EventSource(`${API_URL}/fights/stream?${new URLSearchParams(CARD_PARTITION)}`);
+  cardEventSource.onopen = () => {
+    liveFeedConnected = true;
+  };
+  cardEventSource.onerror = () => {
+    // EventSource reconnects on its own, callers fall back to polling meanwhile
+    liveFeedConnected = false;
+  };
+  cardEventSource.addEventListener('card', (message) => {
+    const event: CardEvent = JSON.parse((message as MessageEvent).data);
+    cardEventListeners.forEach((listener) => listener(event));
+  });
+};
+
+const closeCardEventSource = () => {
+  cardEventSource?.close();
+  cardEventSource = null;
+  liveFeedConnected = false;
+};
+
 const api = {
+  // Live feed endpoints
+  subscribeToCardEvents: (listener: CardEventListener): (() => void) => {
+    cardEventListeners.add(listener);
+    openCardEventSource();
+    return () => {
+      cardEventListeners.delete(listener);
+      if (cardEventListeners.size === 0) {
+        closeCardEventSource();
+      }
+    };
+  },
+
+  isLiveFeedConnected: (): boolean => liveFeedConnected,
+
   // Auth endpoints
   login: async (username: string, password: string): Promise<{ token: string }> => {
     const formData = new URLSearchParams();
@@ -76,32 +264,49 @@ const api = {
 
   // Get all fights
   getFights: async (): Promise<Fight[]> => {
-    const response = await axios.get(`${API_URL}/fights`);
-    return response.data;
+    return getWithETag<Fight[]>(`${API_URL}/fights`);
+  },
+
+  // A page of the card in fight order, optionally with only some fields (id and fight_number always come)
+  getFightPage: async (
+    params: { limit?: number; cursor?: number; fields?: (keyof Fight)[] } = {}
+  ): Promise<{ fights: Partial<Fight>[]; nextCursor: number | null }> => {
+    const response = await axios.get(`${API_URL}/fights`, {
+      params: { ...params, fields: params.fields?.join(',') },
+    });
+    const nextCursor = response.headers['x-next-cursor'];
+    return { fights: response.data, nextCursor: nextCursor ? Number(nextCursor) : null };
+  },
+
+  // Get ongoing, ready, next and past fights in a single call
+  getCardState: async (nextLimit: number = 5, pastLimit: number = 10): Promise<CardState> => {
+    if (PUBLIC_STATE_URL) {
+      // Limits are set by the backend's PUBLIC_STATE_NEXT_LIMIT / PUBLIC_STATE_PAST_LIMIT
+      return getWithETag<CardState>(PUBLIC_STATE_URL);
+    }
+    return getWithETag<CardState>(
+      `${API_URL}/fights/state?next_limit=${nextLimit}&past_limit=${pastLimit}`
+    );
   },
 
   // Get ongoing fight
   getOngoingFight: async (): Promise<Fight | null> => {
-    const response = await axios.get(`${API_URL}/fights/ongoing`);
-    return response.data;
+    return getWithETag<Fight | null>(`${API_URL}/fights/ongoing`);
   },
 
   // Get ready fight
   getReadyFight: async (): Promise<Fight | null> => {
-    const response = await axios.get(`${API_URL}/fights/ready`);
-    return response.data;
+    return getWithETag<Fight | null>(`${API_URL}/fights/ready`);
   },
 
   // Get next fights
   getNextFights: async (limit: number = 5): Promise<Fight[]> => {
-    const response = await axios.get(`${API_URL}/fights/next?limit=${limit}`);
-    return response.data;
+    return getWithETag<Fight[]>(`${API_URL}/fights/next?limit=${limit}`);
   },
 
   // Get past fights
   getPastFights: async (limit: number = 10): Promise<Fight[]> => {
-    const response = await axios.get(`${API_URL}/fights/past?limit=${limit}`);
-    return response.data;
+    return getWithETag<Fight[]>(`${API_URL}/fights/past?limit=${limit}`);
   },
 
   // Start a fight
@@ -123,7 +328,7 @@ const api = {
   },
 
   // Import fights from CSV
-  importFights: async (file: File): Promise<{ imported: number }> => {
+  importFights: async (file: File): Promise<ImportReport> => {
     const formData = new FormData();
     formData.append('file', file);
 
@@ -176,6 +381,22 @@ const api = {
     }
   },
 
+  // Update fight number, returning only the fights that moved
+  updateFightNumberDelta: async (fightId: string, newNumber: number): Promise<CardDiff> => {
+    try {
+      const response = await axios.patch(`${API_URL}/fights/${fightId}/number/${newNumber}`, null, {
+        params: { delta: true },
+        headers: {
+          'Authorization': `Bearer ${localStorage.getItem('authToken')}`,
+        },
+      });
+      return response.data;
+    } catch (error: any) {
+      console.error('API Error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
   // Refresh fight times (force recalculation)
   refreshFightTimes: async (): Promise<Fight[]> => {
     try {
@@ -191,6 +412,22 @@ const api = {
     }
   },
 
+  // Refresh fight times, returning only the fights whose time changed
+  refreshFightTimesDelta: async (): Promise<CardDiff> => {
+    try {
+      const response = await axios.post(`${API_URL}/fights/refresh-times`, null, {
+        params: { delta: true },
+        headers: {
+          'Authorization': `Bearer ${localStorage.getItem('authToken')}`,
+        },
+      });
+      return response.data;
+    } catch (error: any) {
+      console.error('API Error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
   // Set start time for first fight
   setStartTime: async (startTime: string): Promise<{ message: string }> => {
     const response = await axios.post(`${API_URL}/fights/start-time`, {
@@ -229,6 +466,21 @@ const api = {
     }
   },
 
+  // Apply several edits in one transaction, the card is rescheduled once
+  applyFightBatch: async (operations: FightOperation[]): Promise<CardDiff> => {
+    try {
+      const response = await axios.post(`${API_URL}/fights/batch`, { operations }, {
+        headers: {
+          'Authorization': `Bearer ${localStorage.getItem('authToken')}`,
+        },
+      });
+      return response.data;
+    } catch (error: any) {
+      console.error('API Error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
   // Delete a fight
   deleteFight: async (fightId: string): Promise<void> => {
     try {
@@ -242,6 +494,31 @@ const api = {
       throw error;
     }
   },
+
+  // Move the completed fights of the ring to the history, once the ring is over
+  archiveFights: async (): Promise<{ archived: number }> => {
+    try {
+      const response = await axios.post(`${API_URL}/fights/archive`);
+      return response.data;
+    } catch (error: any) {
+      console.error('API Error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
+  // Expected and 90th percentile start times of the fights to come
+  getForecast: async (): Promise<CardForecast> => {
+    const response = await axios.get(`${API_URL}/fights/forecast`);
+    return response.data;
+  },
+
+  // Archived fights, most recent first; pass the previous page's next_cursor to continue
+  getHistory: async (
+    params: { event_id?: string; ring_id?: string; limit?: number; cursor?: string } = {}
+  ): Promise<HistoryPage> => {
+    const response = await axios.get(`${API_URL}/history`, { params });
+    return response.data;
+  },
 };
 
 export default api;
@@ -1,22 +1,74 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
 
-from ..utils.config import DATABASE_URL
+from ..utils.config import DATABASE_URL, REQUEST_METRICS
+from ..utils.instrumentation import instrument_engine
+from ..utils.metrics import (
+    db_pool_checkout_duration,
+    db_pool_checkouts,
+    db_pool_connections,
+    db_pool_invalidations,
+    metrics_registry,
+)
+from .pool import PoolMetrics, engine_options
 
 SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
-# Database configuration
-# Only use check_same_thread for SQLite
-connect_args = {}
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+# Database configuration, pool settings come from utils/config.py
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# asyncio driver used for each database backend
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """The same database URL, using the asyncio driver of its backend"""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        return url.render_as_string(hide_password=False)
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+# Async engine for the routes, so database round-trips don't block the event loop.
+# Objects are kept loaded after commit: an expired attribute can't be lazy-loaded
+# outside of an await.
+ASYNC_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Checkout metrics of both pools
+pool_metrics = {
+    "sync": PoolMetrics(engine),
+    "async": PoolMetrics(async_engine.sync_engine),
+}
+
+# SQL statements counted and timed per request
+if REQUEST_METRICS:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+
+def get_pool_stats():
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+def _collect_pool_metrics():
+    for name, stats in get_pool_stats().items():
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            if state in stats:
+                db_pool_connections.set(stats[state], name, state)
+        db_pool_checkouts.set(stats["checkouts"], name)
+        db_pool_checkout_duration.set(stats["checkout_seconds_total"], name)
+        db_pool_invalidations.set(stats["invalidations"], name)
+
+metrics_registry.add_collector(_collect_pool_metrics)
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
@@ -25,6 +77,11 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Context manager for database session (used in deployment scripts)
 @contextmanager
 def get_db_session():
@@ -37,6 +94,29 @@ def get_db_session():
 # Create tables only if they don't exist (preserves data)
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    upgrade_tables()
+
+# Add columns and indexes introduced since the tables were created (preserves data)
+def upgrade_tables():
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                # Derived columns declare how to compute them for the existing rows
+                backfill = column.info.get("backfill")
+                if backfill is not None:
+                    connection.execute(table.update().values({column.name: backfill(table)}))
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for name in table.info.get("obsolete_indexes", []):
+                if name in existing_indexes:
+                    connection.execute(text(f"DROP INDEX {name}"))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
 
 # Recreate tables (for development/testing only - deletes all data!)
 def recreate_tables():
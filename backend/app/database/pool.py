@@ -0,0 +1,115 @@
+import time
+import uuid
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+from ..utils.config import (
+    DB_MAX_OVERFLOW,
+    DB_PGBOUNCER,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS,
+)
+
+
+def _asyncpg_statement_name() -> str:
+    # PgBouncer may hand the same server connection to several clients, unique names never collide
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_engine / create_async_engine keyword arguments for url, from the pool settings in config"""
+    url = make_url(url)
+    backend, driver = url.get_backend_name(), url.get_driver_name()
+
+    if backend == "sqlite":
+        # Single file, no server: only the thread check matters
+        if driver == "pysqlite":
+            return {"connect_args": {"check_same_thread": False}}
+        return {}
+
+    options: Dict[str, Any] = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        # Test connections on checkout, so a connection dropped by the server or a
+        # proxy is replaced instead of failing the request
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if backend != "postgresql":
+        return options
+
+    connect_args: Dict[str, Any] = {}
+    if driver == "asyncpg":
+        if DB_PGBOUNCER:
+            # Server-side prepared statements don't survive transaction pooling
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = _asyncpg_statement_name
+        elif DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    elif DB_STATEMENT_TIMEOUT_MS and not DB_PGBOUNCER:
+        # psycopg2 never prepares statements server-side, only the timeout applies.
+        # PgBouncer rejects startup parameters: set statement_timeout on the role there.
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+class PoolMetrics:
+    """Checkout counters and current state of an engine's connection pool"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        # Time connections were held between checkout and checkin
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            held = time.perf_counter() - checked_out_at
+            self.checkout_seconds_total += held
+            self.checkout_seconds_max = max(self.checkout_seconds_max, held)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self.invalidations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        stats: Dict[str, Any] = {"pool": type(pool).__name__}
+        # Only queue-based pools have a size and an overflow
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if method is not None:
+                stats[name] = method()
+        stats.update(
+            connects=self.connects,
+            checkouts=self.checkouts,
+            invalidations=self.invalidations,
+            checkout_seconds_total=round(self.checkout_seconds_total, 6),
+            checkout_seconds_max=round(self.checkout_seconds_max, 6),
+        )
+        return stats
@@ -0,0 +1,110 @@
+"""Create or upgrade the tables, once per deployment.
+
+    python -m app.database.schema [--force]
+
+The systemd unit runs this before starting the workers (ExecStartPre). The
+fingerprint of the schema it applied is stored in the database: a worker
+starting afterwards reads it in one query and leaves the tables alone,
+instead of reflecting every table and index. --force upgrades whatever the
+stored fingerprint, e.g. after restoring an older dump.
+"""
+import argparse
+import hashlib
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import Column, DateTime, String, Table, delete, insert, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+# Every table must be declared before the fingerprint is taken
+from ..models import fight, history, user  # noqa: F401
+from .database import Base, create_tables, engine
+
+logger = logging.getLogger(__name__)
+
+# Key of the PostgreSQL advisory lock held while upgrading, any constant shared by the processes
+SCHEMA_LOCK_KEY = 0x696E746572636C62
+
+schema_version = Table(
+    "schema_version",
+    Base.metadata,
+    Column("fingerprint", String, primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def schema_fingerprint() -> str:
+    """Digest of the declared tables, columns and indexes: changes with any model change"""
+    digest = hashlib.blake2b(digest_size=16)
+    for table in Base.metadata.sorted_tables:
+        digest.update(f"table {table.name}\n".encode())
+        for column in table.columns:
+            digest.update(f"column {column.name} {column.type!r} {column.nullable}\n".encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            columns = ",".join(str(expression) for expression in index.expressions)
+            digest.update(f"index {index.name} {columns} {index.unique}\n".encode())
+        for name in table.info.get("obsolete_indexes", []):
+            digest.update(f"obsolete {name}\n".encode())
+    return digest.hexdigest()
+
+
+def stored_fingerprint() -> Optional[str]:
+    """Fingerprint recorded by the last upgrade, None before the first one"""
+    with engine.connect() as connection:
+        try:
+            return connection.scalar(select(schema_version.c.fingerprint))
+        except (OperationalError, ProgrammingError):
+            # No schema_version table yet
+            return None
+
+
+@contextmanager
+def _upgrade_lock() -> Iterator[None]:
+    """One process upgrades at a time: the others wait, then find the schema up to date.
+
+    PostgreSQL only; SQLite deployments run this once from ExecStartPre anyway.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+
+def ensure_schema(force: bool = False) -> bool:
+    """Create or upgrade the tables unless the database already has this schema.
+
+    Returns whether they were upgraded.
+    """
+    fingerprint = schema_fingerprint()
+    if not force and stored_fingerprint() == fingerprint:
+        return False
+    with _upgrade_lock():
+        # Another process may have upgraded while we waited for the lock
+        if not force and stored_fingerprint() == fingerprint:
+            return False
+        create_tables()
+        with engine.begin() as connection:
+            connection.execute(delete(schema_version))
+            connection.execute(insert(schema_version).values(fingerprint=fingerprint, applied_at=datetime.now()))
+    logger.info("Database schema upgraded to %s", fingerprint)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="upgrade even if the stored fingerprint matches")
+    args = parser.parse_args()
+
+    upgraded = ensure_schema(force=args.force)
+    print(f"Schema {schema_fingerprint()}: {'upgraded' if upgraded else 'already up to date'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,45 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 
-from .database.database import create_tables
-from .routers import fights, auth
-from .utils.config import ALLOWED_ORIGINS
+from .database.database import get_pool_stats
+from .database.schema import ensure_schema
+from .routers import fights, auth, history
+from .utils.config import ALLOWED_ORIGINS, REQUEST_METRICS
+from .utils.fanout import card_fanout, create_notify_backend
+from .utils.instrumentation import RequestMetricsMiddleware, request_metrics
+from .utils.metrics import metrics_exporter
+from .utils.publisher import state_publisher
+from .utils.serialization import FastJSONResponse
 
 # Forcer le fuseau horaire local
 os.environ['TZ'] = 'Europe/Paris'
 
-app = FastAPI(title="Fight Manager API", redirect_slashes=False)
+# Card changes shared with the other uvicorn workers, unless CARD_NOTIFY=off
+notify_backend = create_notify_backend()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables are upgraded once per deployment (python -m app.database.schema):
+    # here a single query, unless the models changed since
+    ensure_schema()
+    if state_publisher is not None:
+        state_publisher.start()
+    if notify_backend is not None:
+        await card_fanout.start(notify_backend)
+    # Each worker writes its metrics for /metrics to add up
+    metrics_exporter.start()
+    try:
+        yield
+    finally:
+        if state_publisher is not None:
+            await state_publisher.stop()
+        await card_fanout.stop()
+        await metrics_exporter.stop()
+
+app = FastAPI(title="Fight Manager API", redirect_slashes=False, default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # Configure CORS with environment variable
 app.add_middleware(
@@ -18,15 +48,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Query count, SQL and serialization time of every request (Server-Timing header, /metrics)
+if REQUEST_METRICS:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Include routers
 app.include_router(fights.router)
 app.include_router(auth.router)
-
-# Create tables on startup (preserves existing data)
-create_tables()
+app.include_router(history.router)
 
 @app.get("/")
 async def root():
     return {"message": "Fight Manager API is running"}
+
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage of this worker"""
+    return {"pid": os.getpid(), "pools": get_pool_stats()}
+
+@app.get("/health/requests")
+async def request_totals():
+    """Request totals per route of this worker"""
+    return {"pid": os.getpid(), "routes": request_metrics.snapshot()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics, summed over every worker"""
+    return PlainTextResponse(metrics_exporter.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,13 +1,43 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Index, and_
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from datetime import datetime
+from typing import NamedTuple
 
 from ..database.database import Base
+from ..utils.config import DEFAULT_EVENT_ID, DEFAULT_RING_ID
+
+class CardPartition(NamedTuple):
+    """A ring of an event: fight numbers, the ongoing fight and the schedule are per ring"""
+    event_id: str = DEFAULT_EVENT_ID
+    ring_id: str = DEFAULT_RING_ID
+
+DEFAULT_PARTITION = CardPartition()
+
+def compute_duration(nb_rounds, round_duration, rest_time):
+    """Total fight duration in minutes: nb_rounds * round_duration + (nb_rounds - 1) * rest_time
+
+    Works on plain numbers as well as on SQL column expressions.
+    """
+    return nb_rounds * round_duration + (nb_rounds - 1) * rest_time
 
 class Fight(Base):
     __tablename__ = "fights"
 
     id = Column(String, primary_key=True, index=True)
+    # Partition key, fights created before rings existed belong to the default ring
+    event_id = Column(
+        String,
+        nullable=False,
+        default=DEFAULT_EVENT_ID,
+        info={"backfill": lambda table: DEFAULT_EVENT_ID}
+    )
+    ring_id = Column(
+        String,
+        nullable=False,
+        default=DEFAULT_RING_ID,
+        info={"backfill": lambda table: DEFAULT_RING_ID}
+    )
     fight_number = Column(Integer, nullable=False)
     fighter_a = Column(String, nullable=False)
     fighter_a_club = Column(String, nullable=False)
@@ -17,8 +47,74 @@ class Fight(Base):
     round_duration = Column(Float, nullable=False)  # duration of one round in minutes (supports decimals)
     nb_rounds = Column(Integer, nullable=False)  # number of rounds
     rest_time = Column(Float, nullable=False)  # rest time between rounds in minutes (supports decimals)
+    # total duration in minutes, derived from the three columns above so scheduling can run in SQL
+    duration = Column(
+        Float,
+        nullable=False,
+        info={"backfill": lambda table: compute_duration(
+            table.c.nb_rounds, table.c.round_duration, table.c.rest_time
+        )}
+    )
     fight_type = Column(String, nullable=False, default="Muay Thai")
     expected_start = Column(DateTime, nullable=True)
     actual_start = Column(DateTime, nullable=True)
     actual_end = Column(DateTime, nullable=True)
     is_completed = Column(Boolean, default=False)
+
+    # Every index leads with the partition, so a ring's queries never scan
+    # the other rings or past events
+    __table_args__ = (
+        # Card order, renumbering ranges
+        Index("ix_fights_ring_number", event_id, ring_id, fight_number),
+        # Ready / next fights: not started yet, in card order
+        Index(
+            "ix_fights_ring_pending_number",
+            event_id,
+            ring_id,
+            fight_number,
+            postgresql_where=actual_start.is_(None),
+            sqlite_where=actual_start.is_(None),
+        ),
+        # Ongoing fight: started but not ended, at most one row per ring
+        Index(
+            "ix_fights_ring_ongoing",
+            event_id,
+            ring_id,
+            postgresql_where=actual_start.isnot(None) & actual_end.is_(None),
+            sqlite_where=actual_start.isnot(None) & actual_end.is_(None),
+        ),
+        # Past fights: completed, most recently ended first
+        Index(
+            "ix_fights_ring_completed_end",
+            event_id,
+            ring_id,
+            actual_end.desc(),
+            postgresql_where=is_completed == True,
+            sqlite_where=is_completed == True,
+        ),
+        # Indexes replaced by the ones above, dropped by upgrade_tables
+        {"info": {"obsolete_indexes": [
+            "ix_fights_fight_number",
+            "ix_fights_pending_number",
+            "ix_fights_ongoing",
+            "ix_fights_completed_end",
+        ]}},
+    )
+
+    @classmethod
+    def in_partition(cls, partition: CardPartition):
+        """Filter on the fights of one ring"""
+        return and_(cls.event_id == partition.event_id, cls.ring_id == partition.ring_id)
+
+    @validates("nb_rounds", "round_duration", "rest_time")
+    def _sync_duration(self, key, value):
+        # Keep duration in sync whenever one of its components is set
+        components = {
+            "nb_rounds": self.nb_rounds,
+            "round_duration": self.round_duration,
+            "rest_time": self.rest_time,
+        }
+        components[key] = value
+        if None not in components.values():
+            self.duration = compute_duration(**components)
+        return value
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, Index
+
+from ..database.database import Base
+
+class FightHistory(Base):
+    """Completed fight of an archived ring, kept out of the live fights table.
+
+    Compact copy of a Fight: only what a result needs, no scheduling columns.
+    """
+    __tablename__ = "fight_history"
+
+    id = Column(String, primary_key=True)
+    event_id = Column(String, nullable=False)
+    ring_id = Column(String, nullable=False)
+    fight_number = Column(Integer, nullable=False)
+    fighter_a = Column(String, nullable=False)
+    fighter_a_club = Column(String, nullable=False)
+    fighter_b = Column(String, nullable=False)
+    fighter_b_club = Column(String, nullable=False)
+    weight_class = Column(Integer, nullable=False)
+    fight_type = Column(String, nullable=False)
+    nb_rounds = Column(Integer, nullable=False)
+    duration = Column(Float, nullable=False)  # scheduled duration in minutes
+    actual_start = Column(DateTime, nullable=False)
+    actual_end = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+
+    # Keyset pagination walks (actual_end, id) backwards, over every event or within a ring
+    __table_args__ = (
+        Index("ix_fight_history_end", actual_end, id),
+        Index("ix_fight_history_ring_end", event_id, ring_id, actual_end, id),
+    )
@@ -1,43 +1,26 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
+import logging
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-import jwt
-import os
-from pathlib import Path
-from dotenv import load_dotenv
 
-# Load .env from the root directory
-root_dir = Path(__file__).resolve().parents[3]  # Go up 3 levels to reach the root
-load_dotenv(root_dir / '.env')
+from ..utils.auth import create_access_token
+from ..utils.config import ADMIN_PASSWORD, ADMIN_USERNAME
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/auth",
     tags=["auth"]
 )
 
-# Get credentials from environment variables
-ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
-ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin")
-JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key")
-
-print(f"Loaded credentials - Username: {ADMIN_USERNAME}")  # Debug log
-
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(hours=24)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm="HS256")
-    return encoded_jwt
+# Admin sessions last for the whole event
+LOGIN_TOKEN_EXPIRE = timedelta(hours=24)
 
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    print(f"Login attempt - Username: {form_data.username}")  # Debug log
-
     if form_data.username != ADMIN_USERNAME or form_data.password != ADMIN_PASSWORD:
-        print(f"Login failed - Expected: {ADMIN_USERNAME}, Got: {form_data.username}")  # Debug log
+        # Only the attempted username, never the configured one
+        logger.info("Failed login for username %r", form_data.username)
         raise HTTPException(
             status_code=401,
             detail="Incorrect username or password",
@@ -45,6 +28,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
 
     access_token = create_access_token(
-        data={"sub": form_data.username}
+        data={"sub": form_data.username},
+        expires_delta=LOGIN_TOKEN_EXPIRE
     )
     return {"token": access_token}
@@ -1,122 +1,442 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Request
-from sqlalchemy.orm import Session
-import csv
-import io
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import uuid
 
-from ..database.database import get_db
-from ..models.fight import Fight
+from ..database.database import get_async_db
+from ..models.fight import DEFAULT_PARTITION, CardPartition, Fight
 from ..schemas.fight import (
+    CardDiff,
+    CardForecast,
+    CardState,
     Fight as FightSchema,
+    FightBatch,
     FightCreate,
+    FightOperation,
     FightUpdate,
     StartTimeUpdate
 )
-from ..utils.time import update_fight_times, update_subsequent_fights
+from ..utils.time import (
+    get_next_start_time,
+    get_schedule_anchor,
+    reschedule_card,
+    update_fight_times,
+    update_subsequent_fights
+)
+from ..schemas.history import ArchiveReport
+from ..utils.archive import archive_ring
 from ..utils.auth import verify_token
+from ..utils.events import card_events, format_sse, KEEPALIVE_SECONDS
+from ..utils.fanout import card_fanout
+from ..utils.forecast import card_forecaster
+from ..utils.publisher import state_publisher
+from ..utils.snapshot import CardView, card_snapshot
+from ..utils.serialization import PROJECTABLE_FIELDS, dump_partial_fights, fights_response
 
 router = APIRouter(prefix="/fights", tags=["fights"])
 
+def get_partition(
+    event_id: str = DEFAULT_PARTITION.event_id,
+    ring_id: str = DEFAULT_PARTITION.ring_id
+) -> CardPartition:
+    """Ring a request is about, from the event_id and ring_id query parameters"""
+    return CardPartition(event_id, ring_id)
+
+def _card_changed(reason: str, partition: CardPartition) -> int:
+    """Invalidate the ring's card snapshot and notify live-feed clients, once a mutation is committed.
+
+    The other workers are told through the card fanout; the public state
+    files are written by this worker only. Returns the new card version.
+    """
+    version = card_snapshot.invalidate(partition)
+    card_events.publish(reason, version, partition)
+    card_fanout.notify(reason, version, partition)
+    if state_publisher is not None:
+        state_publisher.notify(partition)
+    return version
+
+async def _shift_fight_numbers(
+    db: AsyncSession,
+    partition: CardPartition,
+    delta: int,
+    first: int,
+    last: Optional[int] = None
+) -> None:
+    """Shift the numbers of the ring's fights from first to last (inclusive) by delta, in a single UPDATE"""
+    statement = update(Fight).where(Fight.in_partition(partition), Fight.fight_number >= first)
+    if last is not None:
+        statement = statement.where(Fight.fight_number <= last)
+    await db.execute(statement.values(fight_number=Fight.fight_number + delta))
+
+async def _get_fight(db: AsyncSession, fight_id: str, partition: CardPartition) -> Optional[Fight]:
+    # A fight of another ring is not found
+    return await db.scalar(select(Fight).where(Fight.id == fight_id, Fight.in_partition(partition)))
+
+async def _get_ready_fight(db: AsyncSession, partition: CardPartition) -> Optional[Fight]:
+    """First non-started fight in card order"""
+    return await db.scalar(
+        select(Fight).where(
+            Fight.in_partition(partition),
+            Fight.is_completed == False,
+            Fight.actual_start.is_(None)
+        ).order_by(Fight.fight_number).limit(1)
+    )
+
+async def _get_next_available_fight(db: AsyncSession, ready_fight: Fight, partition: CardPartition) -> Optional[Fight]:
+    """First fight after the ready fight in card order, the lowest one that can be modified.
+
+    Card order rather than expected start, which is only recomputed once a
+    batch of edits is complete.
+    """
+    return await db.scalar(
+        select(Fight).where(
+            Fight.in_partition(partition),
+            Fight.fight_number > ready_fight.fight_number,
+            Fight.is_completed == False
+        ).order_by(Fight.fight_number).limit(1)
+    )
+
+async def _count_fights(db: AsyncSession, partition: CardPartition) -> int:
+    return await db.scalar(select(func.count()).select_from(Fight).where(Fight.in_partition(partition)))
+
+async def _last_fight(db: AsyncSession, partition: CardPartition) -> Optional[Fight]:
+    return await db.scalar(
+        select(Fight).where(Fight.in_partition(partition)).order_by(Fight.fight_number.desc()).limit(1)
+    )
+
+async def _all_fights(db: AsyncSession, partition: CardPartition) -> List[Fight]:
+    # Rescheduling writes expected starts with bulk UPDATEs, reload the objects already in the session
+    result = await db.scalars(
+        select(Fight).where(Fight.in_partition(partition)).order_by(Fight.fight_number)
+        .execution_options(populate_existing=True)
+    )
+    return result.all()
+
+async def _get_fight_or_404(db: AsyncSession, fight_id: str, partition: CardPartition) -> Fight:
+    fight = await _get_fight(db, fight_id, partition)
+    if not fight:
+        raise HTTPException(status_code=404, detail="Fight not found")
+    return fight
+
+async def _first_modifiable_number(db: AsyncSession, partition: CardPartition) -> Optional[int]:
+    """Lowest fight number that can be moved or inserted before: the fight after the ready fight.
+
+    None when the ready fight is the last one to be scheduled.
+    """
+    ready_fight = await _get_ready_fight(db, partition)
+    if not ready_fight:
+        return 1
+    next_available_fight = await _get_next_available_fight(db, ready_fight, partition)
+    return next_available_fight.fight_number if next_available_fight else None
+
+# Card edits shared by the single-edit routes and the batch route. They validate
+# and apply one edit; rescheduling and committing are left to the caller.
+
+async def _move_fight(db: AsyncSession, partition: CardPartition, fight: Fight, new_number: int) -> None:
+    """Give a fight a new number and shift the fights in between"""
+    # Get total number of fights
+    total_fights = await _count_fights(db, partition)
+    if new_number < 1 or new_number > total_fights:
+        raise HTTPException(status_code=400, detail=f"Fight number must be between 1 and {total_fights}")
+
+    min_allowed_number = await _first_modifiable_number(db, partition)
+    if min_allowed_number is None:
+        raise HTTPException(
+            status_code=400,
+            detail="No fights available for reordering"
+        )
+
+    # Check if the fight being moved is allowed to be moved
+    if fight.fight_number < min_allowed_number:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot modify completed fights, ongoing fight, or next ready fight"
+        )
+
+    # Check if the new position is allowed
+    if new_number < min_allowed_number:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot move fight before position {min_allowed_number}"
+        )
+
+    old_number = fight.fight_number
+
+    # Update fight numbers for other fights, both positions are at or after min_allowed_number
+    if new_number > old_number:
+        # Moving fight later in the order
+        await _shift_fight_numbers(db, partition, -1, old_number + 1, new_number)
+    elif new_number < old_number:
+        # Moving fight earlier in the order
+        await _shift_fight_numbers(db, partition, 1, new_number, old_number - 1)
+
+    # Update the target fight's number
+    fight.fight_number = new_number
+
+def _patch_fight(fight: Fight, fight_update: FightUpdate) -> None:
+    """Update a non-started fight's details"""
+    if fight.actual_start:
+        raise HTTPException(status_code=400, detail="Cannot update a fight that has already started")
+
+    if fight.is_completed:
+        raise HTTPException(status_code=400, detail="Cannot update a completed fight")
+
+    # Update fight fields if provided in the request
+    for field, value in fight_update.model_dump(exclude_unset=True).items():
+        setattr(fight, field, value)
+
+async def _remove_fight(db: AsyncSession, partition: CardPartition, fight: Fight, cancel: bool) -> None:
+    """Delete a non-started fight and close the gap in the numbering"""
+    action = "cancel" if cancel else "delete"
+    if fight.actual_start:
+        raise HTTPException(status_code=400, detail=f"Cannot {action} a fight that has already started")
+
+    if cancel and fight.is_completed:
+        raise HTTPException(status_code=400, detail="Cannot cancel a completed fight")
+
+    await db.delete(fight)
+    await _shift_fight_numbers(db, partition, -1, fight.fight_number + 1)
+
+async def _insert_fight(
+    db: AsyncSession,
+    partition: CardPartition,
+    fight: FightCreate,
+    expected_start: datetime
+) -> Fight:
+    """Insert a fight at its requested position, or right after the ready fight"""
+    # Get the lowest fight number that can be modified
+    min_allowed_number = await _first_modifiable_number(db, partition)
+    if min_allowed_number is None:
+        # If no next available fight, add at the end
+        last_fight = await _last_fight(db, partition)
+        min_allowed_number = (last_fight.fight_number + 1) if last_fight else 1
+
+    # Determine the position to insert the new fight
+    position = fight.position if fight.position is not None else min_allowed_number
+
+    # Validate the position
+    if position < min_allowed_number:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot add fight before position {min_allowed_number} due to ongoing or ready fights"
+        )
+
+    # If position is beyond the current last fight, adjust it to be the next number
+    total_fights = await _count_fights(db, partition)
+    if position > total_fights + 1:
+        position = total_fights + 1
+
+    # Update fight numbers for existing fights to make room
+    await _shift_fight_numbers(db, partition, 1, position)
+
+    new_fight = Fight(
+        id=str(uuid.uuid4()),
+        event_id=partition.event_id,
+        ring_id=partition.ring_id,
+        fight_number=position,
+        fighter_a=fight.fighter_a,
+        fighter_a_club=fight.fighter_a_club,
+        fighter_b=fight.fighter_b,
+        fighter_b_club=fight.fighter_b_club,
+        weight_class=fight.weight_class,
+        round_duration=fight.round_duration,
+        nb_rounds=fight.nb_rounds,
+        rest_time=fight.rest_time,
+        fight_type=fight.fight_type,
+        # Placeholder until the card is rescheduled
+        expected_start=expected_start,
+        is_completed=False
+    )
+    db.add(new_fight)
+    return new_fight
+
+async def _apply_operation(
+    db: AsyncSession,
+    partition: CardPartition,
+    operation: FightOperation,
+    expected_start: datetime
+) -> None:
+    if operation.op == "add":
+        await _insert_fight(db, partition, operation.fight, expected_start)
+    else:
+        fight = await _get_fight_or_404(db, operation.fight_id, partition)
+        if operation.op == "move":
+            await _move_fight(db, partition, fight, operation.new_number)
+        elif operation.op == "patch":
+            _patch_fight(fight, operation.changes)
+        else:
+            await _remove_fight(db, partition, fight, cancel=operation.op == "cancel")
+    # Sessions don't autoflush: the bulk UPDATEs of the following operations
+    # must see this one's changes, a moved fight's number included
+    await db.flush()
+
+def _card_rows(fights: List[Fight]) -> Dict[str, tuple]:
+    """Column values of every fight, by id, to tell what a mutation changed"""
+    columns = [column.key for column in Fight.__table__.columns]
+    return {fight.id: tuple(getattr(fight, column) for column in columns) for fight in fights}
+
+def _card_diff(before: Dict[str, tuple], fights: List[Fight], version: int) -> dict:
+    after = _card_rows(fights)
+    return {
+        "version": version,
+        "changed": [fight for fight in fights if before.get(fight.id) != after[fight.id]],
+        "removed": [fight_id for fight_id in before if fight_id not in after],
+    }
+
+def _delta_requested(request: Request, delta: bool = False) -> bool:
+    """Opt-in delta responses, with ?delta=true or the X-Card-Delta: true header"""
+    return delta or request.headers.get("x-card-delta", "").lower() in ("1", "true")
+
+async def _schedule_rows(db: AsyncSession, partition: CardPartition) -> Dict[str, tuple]:
+    """Number and expected start of every fight of the ring, by id, without loading the fights"""
+    rows = await db.execute(
+        select(Fight.id, Fight.fight_number, Fight.expected_start).where(Fight.in_partition(partition))
+    )
+    return {row.id: (row.fight_number, row.expected_start) for row in rows}
+
+async def _schedule_diff(db: AsyncSession, partition: CardPartition, before: Dict[str, tuple], version: int) -> dict:
+    """Delta of a reorder or reschedule: only the fights whose number or expected start changed"""
+    after = await _schedule_rows(db, partition)
+    changed_ids = [fight_id for fight_id, row in after.items() if before.get(fight_id) != row]
+    changed = []
+    if changed_ids:
+        result = await db.scalars(
+            select(Fight).where(Fight.id.in_(changed_ids)).order_by(Fight.fight_number)
+            .execution_options(populate_existing=True)
+        )
+        changed = result.all()
+    return {
+        "version": version,
+        "changed": changed,
+        "removed": [fight_id for fight_id in before if fight_id not in after],
+    }
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison function
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _view_response(request: Request, view: CardView) -> Response:
+    """Send a card view, or 304 Not Modified when the client already holds it"""
+    headers = {"ETag": view.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), view.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=view.content, media_type="application/json", headers=headers)
+
+def _projected_fields(fields: Optional[str]) -> List[str]:
+    """Columns requested with fields=a,b,c; id and fight_number are always sent"""
+    if not fields:
+        return list(PROJECTABLE_FIELDS)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in PROJECTABLE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(PROJECTABLE_FIELDS)}"
+        )
+    return list(dict.fromkeys(["id", "fight_number", *requested]))
+
 @router.get("", response_model=List[FightSchema])
 @router.get("/", response_model=List[FightSchema])
-async def list_fights(db: Session = Depends(get_db)):
+async def list_fights(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[int] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
+    """Every fight of the ring, ordered by expected start.
+
+    With limit, cursor or fields the fights are read in card order instead, at
+    most limit of them after fight number cursor, with only the comma-separated
+    fields. The X-Next-Cursor header holds the cursor of the next page.
+    """
     try:
-        fights = db.query(Fight).order_by(Fight.expected_start).all()
-        return fights
+        if limit is None and cursor is None and fields is None:
+            return _view_response(request, (await card_snapshot.get(db, partition)).all_view())
+
+        columns = _projected_fields(fields)
+        query = select(*(getattr(Fight, column) for column in columns)).where(Fight.in_partition(partition))
+        if cursor is not None:
+            query = query.where(Fight.fight_number > cursor)
+        query = query.order_by(Fight.fight_number)
+        if limit is not None:
+            # One more row tells whether another page follows
+            query = query.limit(limit + 1)
+        rows = (await db.execute(query)).all()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1].fight_number
+
+        view = CardView.from_content(dump_partial_fights(columns, rows).decode())
+        response = _view_response(request, view)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/import")
-async def import_fights(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def import_fights(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    # Imported on first use: csv and the row validators aren't needed to start a worker
+    from ..utils.importer import MissingFieldsError, import_csv_async, open_upload
 
     try:
-        content = await file.read()
-        decoded = content.decode('utf-8')
-        reader = csv.DictReader(io.StringIO(decoded))
-
-        required_fields = {
-            "fighter_a", "fighter_a_club",
-            "fighter_b", "fighter_b_club",
-            "weight_class", "round_duration", "nb_rounds", "rest_time",
-            "fight_type"
-        }
-        if not all(field in reader.fieldnames for field in required_fields):
-            missing_fields = required_fields - set(reader.fieldnames or [])
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required fields: {', '.join(missing_fields)}"
-            )
-
         # Clear existing fights that haven't started
-        db.query(Fight).filter(Fight.actual_start.is_(None)).delete()
+        await db.execute(delete(Fight).where(Fight.in_partition(partition), Fight.actual_start.is_(None)))
 
-        start_time = datetime.now()
-        imported_count = 0
+        # Imported fights follow the ongoing fight, if any
+        anchor = await db.run_sync(get_schedule_anchor, partition)
+        start_time = anchor[0] if anchor else datetime.now()
 
         # Get the highest fight number
-        last_fight = db.query(Fight).order_by(Fight.fight_number.desc()).first()
+        last_fight = await _last_fight(db, partition)
         next_fight_number = (last_fight.fight_number + 1) if last_fight else 1
 
-        for row in reader:
-            try:
-                round_duration = float(row["round_duration"])
-                nb_rounds = int(row["nb_rounds"])
-                rest_time = float(row["rest_time"])
-                weight_class = int(row["weight_class"])
-
-                # Validate round_duration
-                if round_duration <= 0 or round_duration > 60:
-                    continue
-
-                # Validate nb_rounds
-                if nb_rounds <= 0 or nb_rounds > 10:
-                    continue
-
-                # Validate rest_time
-                if rest_time < 0 or rest_time > 10:
-                    continue
-
-                if weight_class <= 0:
-                    continue
-
-                # Calculate total duration
-                total_duration = nb_rounds * round_duration + (nb_rounds - 1) * rest_time
-
-                fight = Fight(
-                    id=str(uuid.uuid4()),
-                    fight_number=next_fight_number,
-                    fighter_a=row["fighter_a"].strip(),
-                    fighter_a_club=row["fighter_a_club"].strip(),
-                    fighter_b=row["fighter_b"].strip(),
-                    fighter_b_club=row["fighter_b_club"].strip(),
-                    weight_class=weight_class,
-                    round_duration=round_duration,
-                    nb_rounds=nb_rounds,
-                    rest_time=rest_time,
-                    fight_type=row["fight_type"].strip(),
-                    expected_start=start_time,
-                    is_completed=False
-                )
-                db.add(fight)
-                imported_count += 1
-                next_fight_number += 1
-                start_time += timedelta(minutes=total_duration + 2)  # FIGHT_DURATION_BUFFER_MINUTES
-            except (ValueError, KeyError):
-                continue
+        try:
+            report = await import_csv_async(
+                db, open_upload(file.file), start_time, next_fight_number, partition=partition
+            )
+        except MissingFieldsError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        db.commit()
-        return {"imported": imported_count}
+        await db.commit()
+        _card_changed("fights_imported", partition)
+        return report._asdict()
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/start-time")
-async def set_start_time(start_time: StartTimeUpdate, db: Session = Depends(get_db)):
+async def set_start_time(
+    start_time: StartTimeUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
     """Set the start time for all fights."""
     try:
         # Parse the time string (HH:mm:ss) and combine with today's date
@@ -133,20 +453,28 @@ async def set_start_time(start_time: StartTimeUpdate, db: Session = Depends(get_
         )
 
         # Update all fight times
-        updated_fights = update_fight_times(db, new_start_time)
+        updated_fights = await db.run_sync(update_fight_times, new_start_time, 0, partition)
         if not updated_fights:
             return {"message": "No fights to update"}
 
+        await db.commit()
+        _card_changed("start_time_set", partition)
+
         return {"message": "Start time updated successfully"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid time format: {str(e)}")
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating start time: {str(e)}")
 
 @router.post("/{fight_id}/start", response_model=FightSchema)
-async def start_fight(fight_id: str, db: Session = Depends(get_db)):
+async def start_fight(
+    fight_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
     try:
-        fight = db.query(Fight).filter(Fight.id == fight_id).first()
+        fight = await _get_fight(db, fight_id, partition)
         if not fight:
             raise HTTPException(status_code=404, detail="Fight not found")
 
@@ -157,10 +485,13 @@ async def start_fight(fight_id: str, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Fight already completed")
 
         # Check if there are any ongoing fights
-        ongoing_fights = db.query(Fight).filter(
-            Fight.actual_start.isnot(None),
-            Fight.actual_end.is_(None)
-        ).first()
+        ongoing_fights = await db.scalar(
+            select(Fight).where(
+                Fight.in_partition(partition),
+                Fight.actual_start.isnot(None),
+                Fight.actual_end.is_(None)
+            ).limit(1)
+        )
 
         if ongoing_fights:
             raise HTTPException(status_code=400, detail="Another fight is in progress")
@@ -170,22 +501,27 @@ async def start_fight(fight_id: str, db: Session = Depends(get_db)):
         fight.expected_start = current_time
 
         # Calculate next available start time for subsequent fights
-        next_start = current_time + timedelta(minutes=fight.duration + 2)  # FIGHT_DURATION_BUFFER_MINUTES
+        next_start = get_next_start_time(current_time, fight.duration)
 
         # Update subsequent fights
-        update_subsequent_fights(db, fight, next_start)
+        await db.run_sync(update_subsequent_fights, fight, next_start)
 
-        db.commit()
+        await db.commit()
+        _card_changed("fight_started", partition)
         return fight
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{fight_id}/end", response_model=FightSchema)
-async def end_fight(fight_id: str, db: Session = Depends(get_db)):
+async def end_fight(
+    fight_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
     try:
-        fight = db.query(Fight).filter(Fight.id == fight_id).first()
+        fight = await _get_fight(db, fight_id, partition)
         if not fight:
             raise HTTPException(status_code=404, detail="Fight not found")
 
@@ -200,205 +536,266 @@ async def end_fight(fight_id: str, db: Session = Depends(get_db)):
         fight.is_completed = True
 
         # Calculate start time for next fights based on actual end time
-        next_start = current_time + timedelta(minutes=2)  # FIGHT_DURATION_BUFFER_MINUTES
+        next_start = get_next_start_time(current_time, 0)
 
         # Update subsequent fights
-        update_subsequent_fights(db, fight, next_start)
+        await db.run_sync(update_subsequent_fights, fight, next_start)
 
-        db.commit()
+        await db.commit()
+        _card_changed("fight_ended", partition)
         return fight
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stream")
+async def stream_fights(request: Request, partition: CardPartition = Depends(get_partition)):
+    """Live feed (Server-Sent Events) pushing an event each time the ring's fight card changes"""
+    async def event_source():
+        queue = card_events.subscribe(partition)
+        try:
+            # Tell the client how long to wait before reconnecting, then send
+            # the ring's current version so it can sync right away
+            yield "retry: 3000\n\n"
+            yield format_sse(card_events.current_event(partition))
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                    yield format_sse(event)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+        finally:
+            card_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx proxy buffering for this response
+        },
+    )
+
+@router.get("/state", response_model=CardState)
+async def get_card_state(
+    request: Request,
+    next_limit: int = 5,
+    past_limit: int = 10,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
+    """Get the ongoing, ready, next and past fights in a single round-trip"""
+    try:
+        return _view_response(request, (await card_snapshot.get(db, partition)).state_view(next_limit, past_limit))
+    except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/ongoing", response_model=Optional[FightSchema])
-async def get_ongoing_fight(db: Session = Depends(get_db)):
+async def get_ongoing_fight(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
     """Get the currently ongoing fight"""
     try:
-        ongoing_fight = db.query(Fight).filter(
-            Fight.actual_start.isnot(None),
-            Fight.actual_end.is_(None)
-        ).first()
-
-        return ongoing_fight
-
+        return _view_response(request, (await card_snapshot.get(db, partition)).ongoing_view())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/ready", response_model=Optional[FightSchema])
-async def get_ready_fight(db: Session = Depends(get_db)):
+async def get_ready_fight(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
     """Get the next fight that should be preparing (first non-started fight in order)"""
     try:
-        # Get the first non-started, non-completed fight in sequential order
-        # This is the next fight to prepare, regardless of which fight is currently ongoing
-        ready_fight = db.query(Fight).filter(
-            Fight.is_completed == False,
-            Fight.actual_start.is_(None)
-        ).order_by(Fight.fight_number).first()
-
-        return ready_fight
-
+        # The first non-started, non-completed fight in sequential order is the
+        # next fight to prepare, regardless of which fight is currently ongoing
+        return _view_response(request, (await card_snapshot.get(db, partition)).ready_view())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/next", response_model=List[FightSchema])
-async def get_next_fights(limit: int = 5, db: Session = Depends(get_db)):
+async def get_next_fights(
+    request: Request,
+    limit: int = 5,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
     """Get the next upcoming fights that haven't started yet"""
     try:
-        # Get the ongoing fight and ready fight first
-        ongoing_fight = db.query(Fight).filter(
-            Fight.actual_start.isnot(None),
-            Fight.actual_end.is_(None)
-        ).first()
-
-        # Get ready fight (first non-started fight in order)
-        ready_fight = db.query(Fight).filter(
-            Fight.is_completed == False,
-            Fight.actual_start.is_(None)
-        ).order_by(Fight.fight_number).first()
-
-        # Get next fights after the ready fight
-        next_fights_query = db.query(Fight).filter(
-            Fight.actual_start.is_(None),
-            Fight.is_completed == False
-        )
-
-        if ready_fight:
-            # Show fights that come after the ready fight
-            next_fights_query = next_fights_query.filter(
-                Fight.fight_number > ready_fight.fight_number
-            )
-
-        next_fights = next_fights_query.order_by(Fight.fight_number).limit(limit).all()
-        return next_fights
-
+        # Fights that come after the ready fight
+        return _view_response(request, (await card_snapshot.get(db, partition)).next_view(limit))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/past", response_model=List[FightSchema])
-async def get_past_fights(limit: int = 10, db: Session = Depends(get_db)):
+async def get_past_fights(
+    request: Request,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
     """Get completed fights ordered by completion time (most recent first)"""
     try:
-        past_fights = db.query(Fight).filter(
-            Fight.is_completed == True,
-            Fight.actual_end.isnot(None)
-        ).order_by(Fight.actual_end.desc()).limit(limit).all()
+        return _view_response(request, (await card_snapshot.get(db, partition)).past_view(limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        return past_fights
+@router.get("/forecast", response_model=CardForecast)
+async def get_forecast(
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
+    """Expected and 90th percentile start times of the fights to come.
 
+    Learned per fight type from how long the fights already fought overran
+    their scheduled duration, and how long changeovers took.
+    """
+    try:
+        return await card_forecaster.forecast(db, partition, datetime.now())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/refresh-times", response_model=List[FightSchema])
-async def refresh_fight_times(db: Session = Depends(get_db), _: dict = Depends(verify_token)):
-    """Force recalculation of all fight expected start times"""
+@router.post("/refresh-times", response_model=Union[List[FightSchema], CardDiff])
+async def refresh_fight_times(
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition),
+    delta: bool = Depends(_delta_requested),
+    _: dict = Depends(verify_token)
+):
+    """Force recalculation of all fight expected start times.
+
+    Returns every fight, or with delta only the fights whose expected start changed.
+    """
     try:
-        # Get the first fight to use as reference
-        first_fight = db.query(Fight).order_by(Fight.fight_number).first()
+        before = await _schedule_rows(db, partition) if delta else None
 
-        if not first_fight or not first_fight.expected_start:
+        # Recalculate from after the ongoing fight, or from the first non-started fight
+        anchor = await db.run_sync(get_schedule_anchor, partition)
+        if anchor is None:
             raise HTTPException(
                 status_code=400,
                 detail="No fights found or first fight has no expected start time"
             )
 
-        # Check if there's an ongoing fight
-        ongoing_fight = db.query(Fight).filter(
-            Fight.actual_start.isnot(None),
-            Fight.actual_end.is_(None)
-        ).first()
-
-        if ongoing_fight:
-            # If there's an ongoing fight, recalculate from after it
-            from ..utils.config import FIGHT_DURATION_BUFFER_MINUTES
-            next_time = ongoing_fight.actual_start + timedelta(
-                minutes=ongoing_fight.duration + FIGHT_DURATION_BUFFER_MINUTES
-            )
-            update_fight_times(db, next_time, min_fight_number=ongoing_fight.fight_number + 1)
-        else:
-            # No ongoing fight, recalculate all from the first fight's expected start
-            update_fight_times(db, first_fight.expected_start)
+        await db.run_sync(reschedule_card, anchor, partition)
 
-        db.commit()
+        await db.commit()
+        version = _card_changed("times_refreshed", partition)
 
+        if delta:
+            return await _schedule_diff(db, partition, before, version)
         # Return all fights in order
-        return db.query(Fight).order_by(Fight.fight_number).all()
+        return fights_response(await _all_fights(db, partition))
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to refresh times: {str(e)}")
 
 @router.delete("", response_model=dict)
 @router.delete("/", response_model=dict)
-async def clear_all_fights(db: Session = Depends(get_db)):
-    """Clear all fights from the database"""
+async def clear_all_fights(
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition)
+):
+    """Clear all fights of the ring"""
     try:
-        db.query(Fight).delete()
-        db.commit()
+        await db.execute(delete(Fight).where(Fight.in_partition(partition)))
+        await db.commit()
+        _card_changed("fights_cleared", partition)
         return {"message": "All fights cleared successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/archive", response_model=ArchiveReport)
+async def archive_fights(
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition),
+    _: dict = Depends(verify_token)
+):
+    """Move the ring's completed fights to the history table, once the ring is over.
+
+    Archived fights leave the card, GET /history serves them.
+    """
+    try:
+        remaining = await db.scalar(
+            select(func.count()).select_from(Fight).where(
+                Fight.in_partition(partition),
+                Fight.is_completed == False
+            )
+        )
+        if remaining:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot archive a ring with {remaining} fights still to come"
+            )
+
+        archived = await db.run_sync(archive_ring, partition, datetime.now())
+        await db.commit()
+        if archived:
+            _card_changed("fights_archived", partition)
+        return {"archived": archived}
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to archive fights: {str(e)}"
+        )
+
 @router.post("/{fight_id}/cancel", response_model=FightSchema)
 async def cancel_fight(
     fight_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition),
     _: dict = Depends(verify_token)  # Add auth requirement
 ):
     """Cancel a fight by deleting it and updating subsequent fight numbers and times"""
     try:
         # Get the fight to cancel
-        fight = db.query(Fight).filter(Fight.id == fight_id).first()
-        if not fight:
-            raise HTTPException(status_code=404, detail="Fight not found")
-
-        if fight.actual_start:
-            raise HTTPException(status_code=400, detail="Cannot cancel a fight that has already started")
-
-        if fight.is_completed:
-            raise HTTPException(status_code=400, detail="Cannot cancel a completed fight")
+        fight = await _get_fight_or_404(db, fight_id, partition)
 
         # Store fight data before deletion for return value
-        fight_data = FightSchema.from_orm(fight)
-
-        # Get all subsequent fights
-        subsequent_fights = db.query(Fight).filter(
-            Fight.fight_number > fight.fight_number
-        ).order_by(Fight.fight_number).all()
+        fight_data = FightSchema.model_validate(fight)
 
-        # Update fight numbers for subsequent fights
-        for subsequent_fight in subsequent_fights:
-            subsequent_fight.fight_number -= 1
+        # The schedule keeps its current starting point
+        anchor = await db.run_sync(get_schedule_anchor, partition)
 
-        # Delete the fight
-        db.delete(fight)
+        # Delete the fight and close the gap in the numbering
+        await _remove_fight(db, partition, fight, cancel=True)
 
-        # Update times for all remaining fights
-        first_fight = db.query(Fight).order_by(Fight.fight_number).first()
-        if first_fight and first_fight.expected_start:
-            update_fight_times(db, first_fight.expected_start)
+        # Update times for the fights still to come
+        await db.run_sync(reschedule_card, anchor, partition)
 
         try:
-            db.commit()
+            await db.commit()
         except Exception as commit_error:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to commit changes: {str(commit_error)}"
             )
 
+        _card_changed("fight_cancelled", partition)
         return fight_data
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to cancel fight: {str(e)}"
@@ -408,157 +805,79 @@ async def cancel_fight(
 async def update_fight(
     fight_id: str,
     fight_update: FightUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition),
     _: dict = Depends(verify_token)  # Add auth requirement
 ):
     """Update a fight's details"""
     try:
         # Get the fight to update
-        fight = db.query(Fight).filter(Fight.id == fight_id).first()
-        if not fight:
-            raise HTTPException(status_code=404, detail="Fight not found")
+        fight = await _get_fight_or_404(db, fight_id, partition)
+        _patch_fight(fight, fight_update)
 
-        if fight.actual_start:
-            raise HTTPException(status_code=400, detail="Cannot update a fight that has already started")
-
-        if fight.is_completed:
-            raise HTTPException(status_code=400, detail="Cannot update a completed fight")
-
-        # Update fight fields if provided in the request
-        for field, value in fight_update.dict(exclude_unset=True).items():
-            setattr(fight, field, value)
+        # A new duration moves every following fight
+        await db.run_sync(reschedule_card, None, partition)
 
         try:
-            db.commit()
+            await db.commit()
         except Exception as commit_error:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to commit changes: {str(commit_error)}"
             )
 
+        _card_changed("fight_updated", partition)
+        # Its expected start was written by the bulk reschedule
+        await db.refresh(fight)
         return fight
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to update fight: {str(e)}"
         )
 
-@router.patch("/{fight_id}/number/{new_number}", response_model=List[FightSchema])
+@router.patch("/{fight_id}/number/{new_number}", response_model=Union[List[FightSchema], CardDiff])
 async def update_fight_number(
     fight_id: str,
     new_number: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition),
+    delta: bool = Depends(_delta_requested),
     _: dict = Depends(verify_token)
 ):
-    """Update a fight's number and reorder other fights accordingly"""
-    try:
-        # Get the fight to update
-        fight = db.query(Fight).filter(Fight.id == fight_id).first()
-        if not fight:
-            raise HTTPException(status_code=404, detail="Fight not found")
-
-        # Get total number of fights
-        total_fights = db.query(Fight).count()
-        if new_number < 1 or new_number > total_fights:
-            raise HTTPException(status_code=400, detail=f"Fight number must be between 1 and {total_fights}")
-
-        # Get ongoing fight
-        ongoing_fight = db.query(Fight).filter(
-            Fight.actual_start.isnot(None),
-            Fight.actual_end.is_(None)
-        ).first()
-
-        # Get ready fight (first non-started fight in order)
-        ready_fight = db.query(Fight).filter(
-            Fight.is_completed == False,
-            Fight.actual_start.is_(None)
-        ).order_by(Fight.fight_number).first()
-
-        # Get the lowest fight number that can be modified
-        # This will be the fight after the ready fight
-        if ready_fight:
-            next_available_fight = db.query(Fight).filter(
-                Fight.expected_start > ready_fight.expected_start,
-                Fight.is_completed == False
-            ).order_by(Fight.expected_start).first()
-
-            if next_available_fight:
-                min_allowed_number = next_available_fight.fight_number
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No fights available for reordering"
-                )
-        else:
-            min_allowed_number = 1
-
-        # Check if the fight being moved is allowed to be moved
-        if fight.fight_number < min_allowed_number:
-            raise HTTPException(
-                status_code=400,
-                detail="Cannot modify completed fights, ongoing fight, or next ready fight"
-            )
+    """Update a fight's number and reorder other fights accordingly.
 
-        # Check if the new position is allowed
-        if new_number < min_allowed_number:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot move fight before position {min_allowed_number}"
-            )
-
-        old_number = fight.fight_number
-
-        # Update fight numbers for other fights
-        if new_number > old_number:
-            # Moving fight later in the order
-            db.query(Fight).filter(
-                Fight.fight_number > old_number,
-                Fight.fight_number <= new_number,
-                Fight.fight_number >= min_allowed_number
-            ).update({Fight.fight_number: Fight.fight_number - 1})
-        else:
-            # Moving fight earlier in the order
-            db.query(Fight).filter(
-                Fight.fight_number >= new_number,
-                Fight.fight_number < old_number,
-                Fight.fight_number >= min_allowed_number
-            ).update({Fight.fight_number: Fight.fight_number + 1})
+    Returns every fight, or with delta only the fights whose number or expected start changed.
+    """
+    try:
+        before = await _schedule_rows(db, partition) if delta else None
 
-        # Update the target fight's number
-        fight.fight_number = new_number
+        # Get the fight to update
+        fight = await _get_fight_or_404(db, fight_id, partition)
+        await _move_fight(db, partition, fight, new_number)
 
         # Update expected start times for fights after ongoing/ready
-        if ongoing_fight:
-            # If there's an ongoing fight, calculate next time slot after it
-            from datetime import timedelta
-            from ..utils.config import FIGHT_DURATION_BUFFER_MINUTES
-            next_time = ongoing_fight.actual_start + timedelta(
-                minutes=ongoing_fight.duration + FIGHT_DURATION_BUFFER_MINUTES
-            )
-            # Only update fights after the ongoing one
-            update_fight_times(db, next_time, min_fight_number=ongoing_fight.fight_number + 1)
-        else:
-            # No ongoing fight, recalculate all from the start
-            first_fight = db.query(Fight).order_by(Fight.fight_number).first()
-            if first_fight and first_fight.expected_start:
-                update_fight_times(db, first_fight.expected_start)
+        await db.run_sync(reschedule_card, None, partition)
 
-        db.commit()
+        await db.commit()
+        version = _card_changed("fight_renumbered", partition)
 
+        if delta:
+            return await _schedule_diff(db, partition, before, version)
         # Return all fights in their new order
-        return db.query(Fight).order_by(Fight.fight_number).all()
+        return fights_response(await _all_fights(db, partition))
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to update fight number: {str(e)}"
@@ -567,183 +886,133 @@ async def update_fight_number(
 @router.post("/add", response_model=FightSchema)
 async def add_fight(
     fight: FightCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition),
     _: dict = Depends(verify_token)
 ):
     """Add a new fight with proper positioning"""
     try:
-        # Get ongoing fight
-        ongoing_fight = db.query(Fight).filter(
-            Fight.actual_start.isnot(None),
-            Fight.actual_end.is_(None)
-        ).first()
-
-        # Get ready fight (first non-started fight in order)
-        ready_fight = db.query(Fight).filter(
-            Fight.is_completed == False,
-            Fight.actual_start.is_(None)
-        ).order_by(Fight.fight_number).first()
+        # The new fight is scheduled along with the others, from the current starting point
+        anchor = await db.run_sync(get_schedule_anchor, partition) or (datetime.now(), 1)
 
-        # Get the lowest fight number that can be modified
-        # This will be the fight after the ready fight
-        if ready_fight:
-            next_available_fight = db.query(Fight).filter(
-                Fight.expected_start > ready_fight.expected_start,
-                Fight.is_completed == False
-            ).order_by(Fight.expected_start).first()
-
-            if next_available_fight:
-                min_allowed_number = next_available_fight.fight_number
-            else:
-                # If no next available fight, add at the end
-                last_fight = db.query(Fight).order_by(Fight.fight_number.desc()).first()
-                min_allowed_number = (last_fight.fight_number + 1) if last_fight else 1
-        else:
-            min_allowed_number = 1
+        new_fight = await _insert_fight(db, partition, fight, anchor[0])
 
-        # Determine the position to insert the new fight
-        position = fight.position if fight.position is not None else min_allowed_number
+        await db.run_sync(reschedule_card, anchor, partition)
 
-        # Validate the position
-        if position < min_allowed_number:
+        try:
+            await db.commit()
+        except Exception as commit_error:
+            await db.rollback()
             raise HTTPException(
-                status_code=400,
-                detail=f"Cannot add fight before position {min_allowed_number} due to ongoing or ready fights"
+                status_code=500,
+                detail=f"Failed to commit changes: {str(commit_error)}"
             )
 
-        # Get total number of fights
-        total_fights = db.query(Fight).count()
+        _card_changed("fight_added", partition)
+        # Its expected start was written by the bulk reschedule
+        await db.refresh(new_fight)
+        return new_fight
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to add fight: {str(e)}"
+        )
+
+@router.post("/batch", response_model=CardDiff)
+async def apply_fight_batch(
+    batch: FightBatch,
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition),
+    _: dict = Depends(verify_token)
+):
+    """Apply several card edits (move, patch, cancel, add, delete) in order, in one transaction.
 
-        # If position is beyond the current last fight, adjust it to be the next number
-        if position > total_fights + 1:
-            position = total_fights + 1
+    The card is rescheduled once, after the last operation. If an operation
+    fails nothing is applied, and the error names the failing operation.
+    Returns the fights added or modified and the ids of the removed ones.
+    """
+    try:
+        before = _card_rows(await _all_fights(db, partition))
 
-        # Calculate the expected start time for the new fight
-        base_time = None
-        if ongoing_fight:
-            # If there's an ongoing fight, base the time on it
-            base_time = ongoing_fight.actual_start + timedelta(minutes=ongoing_fight.duration + 2)
+        # Edits never move the starting point of the schedule
+        anchor = await db.run_sync(get_schedule_anchor, partition) or (datetime.now(), 1)
 
-            # If we're inserting after the ready fight, adjust base time
-            if ready_fight and position > ready_fight.fight_number:
-                base_time = ready_fight.expected_start + timedelta(minutes=ready_fight.duration + 2)
-        else:
-            # If no ongoing fight, use the ready fight's time or now
-            base_time = ready_fight.expected_start if ready_fight else datetime.now()
-
-        # Create the new fight with calculated expected_start
-        new_fight = Fight(
-            id=str(uuid.uuid4()),
-            fight_number=position,
-            fighter_a=fight.fighter_a,
-            fighter_a_club=fight.fighter_a_club,
-            fighter_b=fight.fighter_b,
-            fighter_b_club=fight.fighter_b_club,
-            weight_class=fight.weight_class,
-            duration=fight.duration,
-            fight_type=fight.fight_type,
-            expected_start=base_time,
-            is_completed=False
-        )
-        db.add(new_fight)
-
-        # Update fight numbers for existing fights to make room
-        db.query(Fight).filter(
-            Fight.fight_number >= position,
-            Fight.fight_number >= min_allowed_number
-        ).update({Fight.fight_number: Fight.fight_number + 1})
-
-        # Commit the new fight and number updates first
-        db.commit()
-
-        # Now update all expected start times for fights after the ongoing/ready fight
-        if ongoing_fight:
-            subsequent_fights = db.query(Fight).filter(
-                Fight.fight_number > ongoing_fight.fight_number,
-                Fight.id != ongoing_fight.id
-            ).order_by(Fight.fight_number).all()
-        else:
-            subsequent_fights = db.query(Fight).filter(
-                Fight.is_completed == False
-            ).order_by(Fight.fight_number).all()
+        for index, operation in enumerate(batch.operations):
+            try:
+                await _apply_operation(db, partition, operation, anchor[0])
+            except HTTPException as e:
+                raise HTTPException(
+                    status_code=e.status_code,
+                    detail=f"Operation {index} ({operation.op}): {e.detail}"
+                )
 
-        current_time = base_time
-        for fight in subsequent_fights:
-            if fight.id != new_fight.id and not fight.actual_start:
-                fight.expected_start = current_time
-                current_time += timedelta(minutes=fight.duration + 2)
+        await db.run_sync(reschedule_card, anchor, partition)
 
         try:
-            db.commit()
+            await db.commit()
         except Exception as commit_error:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to commit changes: {str(commit_error)}"
             )
 
-        # Return all fights in their new order to ensure proper update in frontend
-        return new_fight
+        version = _card_changed("fights_batch", partition)
+        return _card_diff(before, await _all_fights(db, partition), version)
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to add fight: {str(e)}"
+            detail=f"Failed to apply batch: {str(e)}"
         )
 
 @router.delete("/{fight_id}", response_model=dict)
 async def delete_fight(
     fight_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    partition: CardPartition = Depends(get_partition),
     _: dict = Depends(verify_token)  # Add auth requirement
 ):
     """Delete a specific fight and adjust subsequent fight numbers and times"""
     try:
         # Get the fight to delete
-        fight = db.query(Fight).filter(Fight.id == fight_id).first()
-        if not fight:
-            raise HTTPException(status_code=404, detail="Fight not found")
-
-        if fight.actual_start:
-            raise HTTPException(status_code=400, detail="Cannot delete a fight that has already started")
-
-        # Get all subsequent fights before deletion
-        subsequent_fights = db.query(Fight).filter(
-            Fight.fight_number > fight.fight_number
-        ).order_by(Fight.fight_number).all()
+        fight = await _get_fight_or_404(db, fight_id, partition)
 
-        # Update fight numbers for subsequent fights
-        for subsequent_fight in subsequent_fights:
-            subsequent_fight.fight_number -= 1
+        # The schedule keeps its current starting point
+        anchor = await db.run_sync(get_schedule_anchor, partition)
 
-        # Delete the fight
-        db.delete(fight)
+        # Delete the fight and close the gap in the numbering
+        await _remove_fight(db, partition, fight, cancel=False)
 
-        # Update times for all remaining fights
-        first_fight = db.query(Fight).order_by(Fight.fight_number).first()
-        if first_fight and first_fight.expected_start:
-            update_fight_times(db, first_fight.expected_start)
+        # Update times for the fights still to come
+        await db.run_sync(reschedule_card, anchor, partition)
 
         try:
-            db.commit()
+            await db.commit()
         except Exception as commit_error:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to commit changes: {str(commit_error)}"
             )
 
+        _card_changed("fight_deleted", partition)
         return {"message": "Fight deleted successfully"}
 
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to delete fight: {str(e)}"
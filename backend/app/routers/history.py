@@ -0,0 +1,30 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.database import get_async_db
+from ..schemas.history import HistoryPage
+from ..utils.archive import InvalidCursorError, history_page, history_query
+
+router = APIRouter(prefix="/history", tags=["history"])
+
+@router.get("", response_model=HistoryPage)
+@router.get("/", response_model=HistoryPage)
+async def list_history(
+    event_id: Optional[str] = None,
+    ring_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Archived fights, most recently ended first.
+
+    Pass the next_cursor of a page as cursor to get the following one.
+    """
+    try:
+        query = history_query(limit, cursor, event_id, ring_id)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = (await db.scalars(query)).all()
+    return history_page(rows, limit)
@@ -1,8 +1,11 @@
-from pydantic import BaseModel, field_validator, field_serializer, computed_field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, field_serializer, computed_field
+from typing import Annotated, List, Literal, Optional, Union
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+# Naive datetimes are stored in the venue's local time
+LOCAL_TIMEZONE = ZoneInfo('Europe/Paris')
+
 class FightBase(BaseModel):
     fighter_a: str
     fighter_a_club: str
@@ -90,6 +93,8 @@ class FightUpdate(BaseModel):
 
 class Fight(FightBase):
     id: str
+    event_id: str
+    ring_id: str
     fight_number: int
     expected_start: datetime
     actual_start: Optional[datetime] = None
@@ -108,11 +113,95 @@ class Fight(FightBase):
             return None
         # If datetime is naive (no timezone), assume Europe/Paris
         if value.tzinfo is None:
-            value = value.replace(tzinfo=ZoneInfo('Europe/Paris'))
+            value = value.replace(tzinfo=LOCAL_TIMEZONE)
         return value.isoformat()
 
     class Config:
         from_attributes = True
 
+class CardState(BaseModel):
+    """Spectator view of the card: what is on, what is next and what just happened"""
+    ongoing: Optional[Fight] = None
+    ready: Optional[Fight] = None
+    next: List[Fight] = []
+    past: List[Fight] = []
+
+class CardDiff(BaseModel):
+    """Fights added or modified by a mutation, and the ids of the removed ones"""
+    version: int
+    changed: List[Fight] = []
+    removed: List[str] = []
+
+class FightForecast(BaseModel):
+    """Forecast start of a fight to come, against its scheduled start"""
+    id: str
+    fight_number: int
+    fighter_a: str
+    fighter_b: str
+    fight_type: str
+    scheduled_start: Optional[datetime] = None
+    expected_start: datetime
+    p90_start: datetime  # 9 times out of 10 the fight starts before this
+
+    @field_serializer('scheduled_start', 'expected_start', 'p90_start')
+    def serialize_datetime(self, value: Optional[datetime]) -> Optional[str]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=LOCAL_TIMEZONE)
+        return value.isoformat()
+
+class FightTypeObservations(BaseModel):
+    """Observed overrun of the scheduled duration and changeover before the fight, in minutes"""
+    fight_type: str
+    overrun_samples: int
+    overrun_mean: float
+    overrun_std: float
+    changeover_samples: int
+    changeover_mean: float
+    changeover_std: float
+
+class CardForecast(BaseModel):
+    generated_at: datetime
+    fights: List[FightForecast] = []
+    stats: List[FightTypeObservations] = []
+
+    @field_serializer('generated_at')
+    def serialize_generated_at(self, value: datetime) -> str:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=LOCAL_TIMEZONE)
+        return value.isoformat()
+
+class MoveOperation(BaseModel):
+    op: Literal["move"]
+    fight_id: str
+    new_number: int
+
+class PatchOperation(BaseModel):
+    op: Literal["patch"]
+    fight_id: str
+    changes: FightUpdate
+
+class CancelOperation(BaseModel):
+    op: Literal["cancel"]
+    fight_id: str
+
+class DeleteOperation(BaseModel):
+    op: Literal["delete"]
+    fight_id: str
+
+class AddOperation(BaseModel):
+    op: Literal["add"]
+    fight: FightCreate
+
+FightOperation = Annotated[
+    Union[MoveOperation, PatchOperation, CancelOperation, DeleteOperation, AddOperation],
+    Field(discriminator="op")
+]
+
+class FightBatch(BaseModel):
+    """Card edits applied in order, in a single transaction"""
+    operations: List[FightOperation] = Field(min_length=1)
+
 class StartTimeUpdate(BaseModel):
     start_time: str
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ConfigDict, field_serializer
+from typing import List, Optional
+from datetime import datetime
+
+from .fight import LOCAL_TIMEZONE
+
+class FightRecord(BaseModel):
+    """Archived fight"""
+    id: str
+    event_id: str
+    ring_id: str
+    fight_number: int
+    fighter_a: str
+    fighter_a_club: str
+    fighter_b: str
+    fighter_b_club: str
+    weight_class: int
+    fight_type: str
+    nb_rounds: int
+    duration: float
+    actual_start: datetime
+    actual_end: datetime
+    archived_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_serializer('actual_start', 'actual_end', 'archived_at')
+    def serialize_datetime(self, value: datetime) -> str:
+        # Naive datetimes are in local time, as for live fights
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=LOCAL_TIMEZONE)
+        return value.isoformat()
+
+class HistoryPage(BaseModel):
+    """A page of archived fights, and the cursor of the next one (None on the last page)"""
+    items: List[FightRecord]
+    next_cursor: Optional[str] = None
+
+class ArchiveReport(BaseModel):
+    archived: int
@@ -0,0 +1,78 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DateTime, and_, delete, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from ..models.fight import CardPartition, Fight
+from ..models.history import FightHistory
+
+# Columns copied from the live table, archived_at is set on the way
+ARCHIVED_COLUMNS = [column.name for column in FightHistory.__table__.columns if column.name != "archived_at"]
+
+class InvalidCursorError(ValueError):
+    """Raised when a history cursor can't be decoded"""
+
+def archive_ring(db: Session, partition: CardPartition, archived_at: datetime) -> int:
+    """Move the completed fights of a ring to the history table, in one INSERT ... SELECT and one DELETE.
+
+    The caller owns the transaction. Returns the number of fights archived.
+    """
+    finished = and_(
+        Fight.in_partition(partition),
+        Fight.is_completed == True,
+        Fight.actual_start.isnot(None),
+        Fight.actual_end.isnot(None)
+    )
+    rows = select(
+        *(getattr(Fight, name) for name in ARCHIVED_COLUMNS),
+        literal(archived_at, DateTime)
+    ).where(finished)
+    db.execute(insert(FightHistory).from_select([*ARCHIVED_COLUMNS, "archived_at"], rows))
+    return db.execute(delete(Fight).where(finished)).rowcount
+
+def encode_cursor(fight: FightHistory) -> str:
+    """Opaque position after a fight, for the next page"""
+    raw = f"{fight.actual_end.isoformat()}|{fight.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        actual_end, fight_id = raw.split("|", 1)
+        return datetime.fromisoformat(actual_end), fight_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Invalid history cursor")
+
+def history_query(
+    limit: int,
+    cursor: Optional[str] = None,
+    event_id: Optional[str] = None,
+    ring_id: Optional[str] = None
+):
+    """Archived fights, most recently ended first, starting after the cursor.
+
+    Keyset pagination on (actual_end, id): every page is an index range scan,
+    however deep it is. Selects one row more than limit to tell whether
+    another page follows.
+    """
+    query = select(FightHistory)
+    if event_id is not None:
+        query = query.where(FightHistory.event_id == event_id)
+    if ring_id is not None:
+        query = query.where(FightHistory.ring_id == ring_id)
+    if cursor is not None:
+        actual_end, fight_id = decode_cursor(cursor)
+        query = query.where(or_(
+            FightHistory.actual_end < actual_end,
+            and_(FightHistory.actual_end == actual_end, FightHistory.id < fight_id)
+        ))
+    return query.order_by(FightHistory.actual_end.desc(), FightHistory.id.desc()).limit(limit + 1)
+
+def history_page(rows: List[FightHistory], limit: int) -> dict:
+    """Split the rows of history_query into a page and the cursor of the next one"""
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,41 +1,102 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import Optional, Tuple
+import hashlib
+import time
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 
 from ..database.database import get_db
 from ..models.user import User
 from ..schemas.auth import TokenData
+from .config import JWT_CACHE_SIZE, JWT_CACHE_TTL_SECONDS, JWT_SECRET
 
 # Configuration
-SECRET_KEY = "your-secret-key-keep-it-secret"  # Change this in production!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-# Load .env from the root directory
-root_dir = Path(__file__).resolve().parents[3]  # Go up 3 levels to reach the root
-load_dotenv(root_dir / '.env')
-
-JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key")
 security = HTTPBearer()
 
+class TokenCache:
+    """Bounded LRU cache of verified token payloads, keyed by the token digest.
+
+    An entry is kept at most ttl seconds and never past the token's exp claim,
+    so a cached token expires exactly when the token itself does.
+    """
+
+    def __init__(self, maxsize: int = JWT_CACHE_SIZE, ttl: float = JWT_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        # Never keep the tokens themselves in memory
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (min(time.time() + self.ttl, payload["exp"]), payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+token_cache = TokenCache()
+
+def decode_token(token: str) -> dict:
+    """Verify a token signed with JWT_SECRET and return its payload.
+
+    Tokens must carry an exp claim. Raises HTTPException 401 when the token is
+    invalid or expired.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    # Imported on first use, as the cryptography backend it loads slows every worker's start
+    import jwt
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM], options={"require": ["exp"]})
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    token_cache.put(token, payload)
+    return payload
+
+@lru_cache(maxsize=None)
+def password_context():
+    """Password hashing, built on first use: the admin login compares plain strings"""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_context().hash(password)
 
 def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
     user = db.query(User).filter(User.username == username).first()
@@ -44,10 +105,12 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=ALGORITHM)
     return encoded_jwt
 
 async def get_current_user(
@@ -61,13 +124,13 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        payload = decode_token(token)
+    except HTTPException:
         raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
+        raise credentials_exception
+    token_data = TokenData(username=username)
 
     user = db.query(User).filter(User.username == token_data.username).first()
     if user is None:
@@ -92,18 +155,6 @@ async def get_current_admin_user(
     return current_user
 
 async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        exp = payload.get("exp")
-        if exp is None:
-            raise HTTPException(status_code=401, detail="Token is invalid")
-        if datetime.utcnow().timestamp() > exp:
-            raise HTTPException(status_code=401, detail="Token has expired")
-        return payload
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=str(e))
+    return decode_token(credentials.credentials)
 
 require_auth = Depends(verify_token)
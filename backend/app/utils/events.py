@@ -0,0 +1,93 @@
+import asyncio
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import live_feed_clients, metrics_registry
+
+# (event_id, ring_id) of the card an event is about
+Partition = Tuple[str, str]
+
+# Seconds between keep-alive comments on an idle live feed
+KEEPALIVE_SECONDS = 15
+
+
+class CardEventBroker:
+    """Fan out "card state changed" events to the connected live-feed clients.
+
+    Each subscriber gets a queue holding at most one pending event: clients only
+    need to know that the card changed, so a slow client simply receives the
+    latest event instead of a backlog. Subscribers may follow a single ring, they
+    then only receive the events of that ring.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[asyncio.Queue, Optional[Partition]] = {}
+        # Called with every event, none is dropped
+        self._listeners: List[Callable[[dict], None]] = []
+        self.version = 0
+        self.last_reason: Optional[str] = None
+        self.last_partition: Optional[Partition] = None
+        # Latest event of each ring, and the latest one about every ring (a resync)
+        self._ring_events: Dict[Partition, dict] = {}
+        self._all_rings_event: Optional[dict] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, partition: Optional[Partition] = None) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers[queue] = partition
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.pop(queue, None)
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[dict], None]) -> None:
+        self._listeners.remove(listener)
+
+    def current_event(self, partition: Optional[Partition] = None) -> dict:
+        """The latest event, or the latest one concerning a ring when given"""
+        if partition is None:
+            event = {"version": self.version, "reason": self.last_reason}
+            if self.last_partition is not None:
+                event["event_id"], event["ring_id"] = self.last_partition
+            return event
+
+        partition = tuple(partition)
+        events = [e for e in (self._ring_events.get(partition), self._all_rings_event) if e is not None]
+        latest = max(events, key=lambda e: e["version"]) if events else {"version": 0, "reason": None}
+        return {"version": latest["version"], "reason": latest["reason"], "event_id": partition[0], "ring_id": partition[1]}
+
+    def publish(self, reason: str, version: Optional[int] = None, partition: Optional[Partition] = None) -> dict:
+        """Notify the subscribers of the partition that its card changed. Must run on the event loop."""
+        self.version = version if version is not None else self.version + 1
+        self.last_reason = reason
+        self.last_partition = tuple(partition) if partition is not None else None
+        event = self.current_event()
+        if partition is None:
+            self._all_rings_event = event
+        else:
+            self._ring_events[self.last_partition] = event
+        for queue, followed in list(self._subscribers.items()):
+            if followed is not None and partition is not None and tuple(followed) != tuple(partition):
+                continue
+            if queue.full():
+                # Drop the stale event, the newest one supersedes it
+                queue.get_nowait()
+            queue.put_nowait(event)
+        for listener in self._listeners:
+            listener(event)
+        return event
+
+
+def format_sse(event: dict, event_name: str = "card") -> str:
+    """Format an event as a Server-Sent Events message."""
+    return f"event: {event_name}\ndata: {json.dumps(event)}\n\n"
+
+
+card_events = CardEventBroker()
+metrics_registry.add_collector(lambda: live_feed_clients.set(card_events.subscriber_count))
@@ -0,0 +1,306 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+from typing import Callable, Optional
+
+from sqlalchemy.engine import make_url
+
+from ..models.fight import CardPartition
+from .config import (
+    CARD_NOTIFY,
+    CARD_NOTIFY_CHANNEL,
+    CARD_NOTIFY_DATABASE_URL,
+    CARD_NOTIFY_FILE,
+    CARD_NOTIFY_POLL_SECONDS,
+    DATABASE_URL,
+    DB_PGBOUNCER,
+)
+from .events import card_events
+from .snapshot import card_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two attempts to reach PostgreSQL again
+RECONNECT_SECONDS = 2
+# Seconds without notification to send before the LISTEN connection is checked
+LISTEN_KEEPALIVE_SECONDS = 15
+# Notifications waiting for the connection, older ones are dropped past that
+MAX_OUTGOING = 1000
+# The notification file is replaced once it grows past this size
+NOTIFY_FILE_MAX_BYTES = 1024 * 1024
+
+# Callbacks of the notification backends: a message from a worker, or None when
+# messages may have been lost
+MessageCallback = Callable[[Optional[str]], None]
+
+
+class PostgresNotifyBackend:
+    """Card changes carried by PostgreSQL NOTIFY, on one connection per worker.
+
+    The connection LISTENs on the channel and also sends this worker's
+    notifications, outside of the pools the requests use. It is re-opened
+    after a failure, and the loss of messages reported to the fanout.
+    """
+
+    def __init__(self, dsn: str, channel: str = CARD_NOTIFY_CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._on_message: Optional[MessageCallback] = None
+        self._outgoing: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def send(self, payload: str) -> None:
+        if self._outgoing is None:
+            return
+        if self._outgoing.full():
+            logger.warning("Card change notifications are not being sent, dropping the oldest")
+            self._outgoing.get_nowait()
+        self._outgoing.put_nowait(payload)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        self._on_message(payload)
+
+    async def _send_loop(self, connection) -> None:
+        while True:
+            try:
+                payload = await asyncio.wait_for(self._outgoing.get(), LISTEN_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # A broken connection would otherwise go unnoticed while only listening
+                await connection.execute("SELECT 1")
+                continue
+            try:
+                await connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except BaseException:
+                # Sent once the connection is back
+                self.send(payload)
+                raise
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        connected_before = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(self.channel, self._on_notification)
+                if connected_before:
+                    # Notifications sent while we were away are lost
+                    self._on_message(None)
+                connected_before = True
+                await self._send_loop(connection)
+            except Exception:
+                logger.warning("Card change notifications interrupted, reconnecting", exc_info=True)
+            finally:
+                if connection is not None:
+                    connection.terminate()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def start(self, on_message: MessageCallback) -> None:
+        self._on_message = on_message
+        self._outgoing = asyncio.Queue(maxsize=MAX_OUTGOING)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._outgoing = None
+
+
+class FileNotifyBackend:
+    """Card changes appended to a file that every worker follows, for SQLite deployments.
+
+    Each notification is one short line written with a single append, so lines
+    of concurrent writers never interleave. Workers read what was appended
+    since their last check every poll_seconds. Past max_bytes the file is
+    replaced by a new one.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        poll_seconds: float = CARD_NOTIFY_POLL_SECONDS,
+        max_bytes: int = NOTIFY_FILE_MAX_BYTES
+    ):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.max_bytes = max_bytes
+        self._on_message: Optional[MessageCallback] = None
+        self._fd: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._partial = b""
+        self._task: Optional[asyncio.Task] = None
+
+    def _open(self) -> None:
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def send(self, payload: str) -> None:
+        if self._fd is None:
+            return
+        try:
+            current = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(self._fd).st_ino:
+            # Replaced by another worker
+            os.close(self._fd)
+            self._open()
+        if os.fstat(self._fd).st_size > self.max_bytes:
+            os.unlink(self.path)
+            os.close(self._fd)
+            self._open()
+        os.write(self._fd, payload.encode() + b"\n")
+
+    def poll(self) -> None:
+        """Hand the lines appended since the last call to the fanout"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Replaced by a writer, the end of the previous file may not have been read
+            self._inode, self._offset, self._partial = stat.st_ino, 0, b""
+            self._on_message(None)
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.path, "rb") as file:
+            file.seek(self._offset)
+            data = file.read(stat.st_size - self._offset)
+        self._offset += len(data)
+        # A line may still be half written
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        for line in lines:
+            if line:
+                self._on_message(line.decode(errors="replace"))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                self.poll()
+            except OSError:
+                logger.warning("Failed to read card change notifications from %s", self.path, exc_info=True)
+
+    async def start(self, on_message: MessageCallback) -> None:
+        self._on_message = on_message
+        self._open()
+        # Only changes made from now on matter
+        stat = os.fstat(self._fd)
+        self._inode, self._offset, self._partial = stat.st_ino, stat.st_size, b""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class CardFanout:
+    """Share card changes between the uvicorn workers.
+
+    Every change committed by this worker is sent to the others through a
+    notification backend. A change received from another worker invalidates
+    this worker's snapshot of the ring and is published to its live-feed
+    clients and listeners, as if it had been made here.
+    """
+
+    def __init__(self):
+        self.origin = ""
+        self.backend = None
+
+    def notify(self, reason: str, version: int, partition: CardPartition) -> None:
+        """Tell the other workers that a ring changed. Must run on the event loop."""
+        if self.backend is None:
+            return
+        self.backend.send(json.dumps({
+            "origin": self.origin,
+            "reason": reason,
+            "version": version,
+            "event_id": partition.event_id,
+            "ring_id": partition.ring_id,
+        }, separators=(",", ":")))
+
+    def receive(self, payload: Optional[str]) -> None:
+        if payload is None:
+            # Some changes may have been missed: every ring is re-read
+            version = card_snapshot.invalidate()
+            card_events.publish("card_resync", version)
+            return
+
+        try:
+            message = json.loads(payload)
+            origin = message["origin"]
+            reason = message["reason"]
+            version = int(message["version"])
+            partition = CardPartition(str(message["event_id"]), str(message["ring_id"]))
+        except (ValueError, TypeError, KeyError):
+            logger.warning("Ignoring malformed card change notification %r", payload)
+            return
+        if origin == self.origin:
+            return
+        version = card_snapshot.invalidate(partition, version)
+        card_events.publish(reason, version, partition)
+
+    async def start(self, backend) -> None:
+        # Set in the worker process itself, not in the one that imported the app
+        self.origin = f"{socket.gethostname()}:{os.getpid()}"
+        self.backend = backend
+        await backend.start(self.receive)
+
+    async def stop(self) -> None:
+        if self.backend is None:
+            return
+        backend, self.backend = self.backend, None
+        await backend.stop()
+
+
+def default_notify_file(database_url: str) -> str:
+    """Temporary file shared by the workers using the same database"""
+    digest = hashlib.blake2b(database_url.encode(), digest_size=6).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"interclub-card-{digest}.log")
+
+
+def create_notify_backend(database_url: str = DATABASE_URL):
+    """The notification backend configured by CARD_NOTIFY, None when sharing is disabled"""
+    backend_name = make_url(database_url).get_backend_name()
+    mode = CARD_NOTIFY
+    if mode == "auto":
+        if backend_name == "postgresql":
+            if DB_PGBOUNCER and not CARD_NOTIFY_DATABASE_URL:
+                logger.warning(
+                    "LISTEN doesn't work through PgBouncer transaction pooling: set "
+                    "CARD_NOTIFY_DATABASE_URL to share card changes between workers"
+                )
+                return None
+            mode = "postgres"
+        elif backend_name == "sqlite":
+            mode = "file"
+
+    if mode == "postgres":
+        url = make_url(CARD_NOTIFY_DATABASE_URL or database_url).set(drivername="postgresql")
+        return PostgresNotifyBackend(url.render_as_string(hide_password=False))
+    if mode == "file":
+        return FileNotifyBackend(CARD_NOTIFY_FILE or default_notify_file(database_url))
+    return None
+
+
+card_fanout = CardFanout()
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+
+def write_atomic(path: str, content: bytes) -> None:
+    """Replace path with content: readers see either the old or the new file, never a partial one"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(content)
+        # mkstemp creates the file readable by its owner only, nginx must read it
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
@@ -0,0 +1,282 @@
+import math
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.fight import CardPartition, Fight
+from ..models.history import FightHistory
+from .config import FIGHT_DURATION_BUFFER_MINUTES, FORECAST_MAX_CHANGEOVER_MINUTES, FORECAST_MIN_SAMPLES
+from .events import card_events
+
+# Standard normal quantile of the 90th percentile
+Z_90 = 1.2815515655446004
+
+
+class RunningStats:
+    """Count, mean and variance of a stream of values, updated one value at a time (Welford)"""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self._m2 = m2
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Statistics of both streams together (Chan et al.)"""
+        count = self.count + other.count
+        if not count:
+            return RunningStats()
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self._m2 + other._m2 + delta * delta * self.count * other.count / count
+        return RunningStats(count, mean, m2)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, 0 below two values"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class FightTypeStats:
+    """What a fight type really takes, in minutes: overrun of its scheduled duration,
+    and changeover before it starts once the previous fight has ended"""
+
+    __slots__ = ("overrun", "changeover")
+
+    def __init__(self, overrun: Optional[RunningStats] = None, changeover: Optional[RunningStats] = None):
+        self.overrun = overrun or RunningStats()
+        self.changeover = changeover or RunningStats()
+
+    def merge(self, other: "FightTypeStats") -> "FightTypeStats":
+        return FightTypeStats(self.overrun.merge(other.overrun), self.changeover.merge(other.changeover))
+
+
+def _minutes(delta: timedelta) -> float:
+    return delta.total_seconds() / 60
+
+
+def learn(fights: Iterable, stats: Dict[str, FightTypeStats]) -> None:
+    """Feed completed fights into per-type statistics.
+
+    fights are rows with event_id, ring_id, fight_type, duration, actual_start
+    and actual_end, ordered by ring then actual start, so that the gap before
+    each fight is measured from the one before it in the same ring.
+    """
+    previous = None
+    for fight in fights:
+        type_stats = stats.get(fight.fight_type)
+        if type_stats is None:
+            type_stats = stats[fight.fight_type] = FightTypeStats()
+        type_stats.overrun.add(_minutes(fight.actual_end - fight.actual_start) - fight.duration)
+
+        if previous is not None and (previous.event_id, previous.ring_id) == (fight.event_id, fight.ring_id):
+            gap = _minutes(fight.actual_start - previous.actual_end)
+            # Longer gaps are breaks or different days, not changeovers
+            if 0 <= gap <= FORECAST_MAX_CHANGEOVER_MINUTES:
+                type_stats.changeover.add(gap)
+        previous = fight
+
+
+class Estimate(NamedTuple):
+    mean: float
+    variance: float
+
+
+class DurationModel:
+    """Overrun and changeover estimates per fight type.
+
+    A fight type's own statistics are used once they hold FORECAST_MIN_SAMPLES
+    observations, the statistics of all types pooled before that, and the
+    static schedule (no overrun, FIGHT_DURATION_BUFFER_MINUTES changeover)
+    when nothing has been observed yet.
+    """
+
+    def __init__(self, stats: Dict[str, FightTypeStats]):
+        self.stats = stats
+        self.pooled = FightTypeStats()
+        for type_stats in stats.values():
+            self.pooled = self.pooled.merge(type_stats)
+
+    @staticmethod
+    def _estimate(candidates: List[RunningStats], default: float) -> Estimate:
+        for running in candidates:
+            if running.count >= FORECAST_MIN_SAMPLES:
+                return Estimate(running.mean, running.variance)
+        return Estimate(default, 0.0)
+
+    def overrun(self, fight_type: str) -> Estimate:
+        type_stats = self.stats.get(fight_type)
+        candidates = [type_stats.overrun] if type_stats else []
+        return self._estimate(candidates + [self.pooled.overrun], 0.0)
+
+    def changeover(self, fight_type: str) -> Estimate:
+        type_stats = self.stats.get(fight_type)
+        candidates = [type_stats.changeover] if type_stats else []
+        return self._estimate(candidates + [self.pooled.changeover], FIGHT_DURATION_BUFFER_MINUTES)
+
+    def summary(self) -> List[dict]:
+        return [
+            {
+                "fight_type": fight_type,
+                "overrun_samples": type_stats.overrun.count,
+                "overrun_mean": type_stats.overrun.mean,
+                "overrun_std": type_stats.overrun.std,
+                "changeover_samples": type_stats.changeover.count,
+                "changeover_mean": type_stats.changeover.mean,
+                "changeover_std": type_stats.changeover.std,
+            }
+            for fight_type, type_stats in sorted(self.stats.items())
+        ]
+
+
+def forecast_starts(
+    model: DurationModel,
+    now: datetime,
+    ongoing: Optional[Fight],
+    pending: List[Fight]
+) -> List[dict]:
+    """Expected and 90th percentile start of each pending fight, in card order.
+
+    A fight starts after the changeover that precedes it and the real length
+    (duration + overrun) of every fight before it. Means and variances of those
+    steps are added up in a single prefix sum each; the 90th percentile assumes
+    independent, normally distributed steps.
+    """
+    if not pending:
+        return []
+
+    if ongoing is not None:
+        overrun = model.overrun(ongoing.fight_type)
+        expected_end = ongoing.actual_start + timedelta(minutes=ongoing.duration + overrun.mean)
+        anchor, anchor_variance = max(now, expected_end), overrun.variance
+        first_gap = model.changeover(pending[0].fight_type)
+    else:
+        # Nothing on: the ready fight starts as scheduled, or now if it is late
+        anchor, anchor_variance = max(now, pending[0].expected_start or now), 0.0
+        first_gap = Estimate(0.0, 0.0)
+
+    # Step before fight i: the previous fight's real length, then the changeover
+    steps = [first_gap]
+    for previous, fight in zip(pending, pending[1:]):
+        overrun = model.overrun(previous.fight_type)
+        gap = model.changeover(fight.fight_type)
+        steps.append(Estimate(previous.duration + overrun.mean + gap.mean, overrun.variance + gap.variance))
+
+    offsets = accumulate(step.mean for step in steps)
+    variances = accumulate((step.variance for step in steps), initial=anchor_variance)
+    next(variances)  # the anchor's own variance is carried by every step
+
+    forecasts = []
+    for fight, offset, variance in zip(pending, offsets, variances):
+        expected_start = anchor + timedelta(minutes=offset)
+        forecasts.append({
+            "id": fight.id,
+            "fight_number": fight.fight_number,
+            "fighter_a": fight.fighter_a,
+            "fighter_b": fight.fighter_b,
+            "fight_type": fight.fight_type,
+            "scheduled_start": fight.expected_start,
+            "expected_start": expected_start,
+            "p90_start": expected_start + timedelta(minutes=Z_90 * math.sqrt(variance)),
+        })
+    return forecasts
+
+
+class CardForecaster:
+    """Forecasts of the fights to come, learned from the fights already fought.
+
+    Statistics of the archived fights are computed once per process and
+    merged with those of the ring's completed fights on each request.
+    """
+
+    def __init__(self):
+        self._history: Optional[Dict[str, FightTypeStats]] = None
+
+    def invalidate_history(self) -> None:
+        self._history = None
+
+    def on_card_event(self, event: dict) -> None:
+        # Archived fights, in this worker or another, now feed the forecasts through the history
+        if event.get("reason") == "fights_archived":
+            self.invalidate_history()
+
+    async def _history_stats(self, db: AsyncSession) -> Dict[str, FightTypeStats]:
+        if self._history is None:
+            rows = await db.execute(
+                select(
+                    FightHistory.event_id,
+                    FightHistory.ring_id,
+                    FightHistory.fight_type,
+                    FightHistory.duration,
+                    FightHistory.actual_start,
+                    FightHistory.actual_end
+                ).order_by(FightHistory.event_id, FightHistory.ring_id, FightHistory.actual_start)
+            )
+            stats: Dict[str, FightTypeStats] = {}
+            learn(rows, stats)
+            self._history = stats
+        return self._history
+
+    async def model(self, db: AsyncSession, partition: CardPartition) -> DurationModel:
+        rows = await db.execute(
+            select(
+                Fight.event_id,
+                Fight.ring_id,
+                Fight.fight_type,
+                Fight.duration,
+                Fight.actual_start,
+                Fight.actual_end
+            ).where(
+                Fight.in_partition(partition),
+                Fight.is_completed == True,
+                Fight.actual_start.isnot(None),
+                Fight.actual_end.isnot(None)
+            ).order_by(Fight.actual_start)
+        )
+        live: Dict[str, FightTypeStats] = {}
+        learn(rows, live)
+
+        stats = dict(await self._history_stats(db))
+        for fight_type, type_stats in live.items():
+            stats[fight_type] = stats[fight_type].merge(type_stats) if fight_type in stats else type_stats
+        return DurationModel(stats)
+
+    async def forecast(self, db: AsyncSession, partition: CardPartition, now: datetime) -> dict:
+        model = await self.model(db, partition)
+        ongoing = await db.scalar(
+            select(Fight).where(
+                Fight.in_partition(partition),
+                Fight.actual_start.isnot(None),
+                Fight.actual_end.is_(None)
+            ).limit(1)
+        )
+        pending = (await db.scalars(
+            select(Fight).where(
+                Fight.in_partition(partition),
+                Fight.is_completed == False,
+                Fight.actual_start.is_(None)
+            ).order_by(Fight.fight_number)
+        )).all()
+        return {
+            "generated_at": now,
+            "fights": forecast_starts(model, now, ongoing, pending),
+            "stats": model.summary(),
+        }
+
+
+card_forecaster = CardForecaster()
+card_events.add_listener(card_forecaster.on_card_event)
@@ -0,0 +1,202 @@
+import asyncio
+import csv
+import io
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, TextIO, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.fight import DEFAULT_PARTITION, CardPartition, Fight, compute_duration
+from ..schemas.fight import FightBase
+from .config import IMPORT_CHUNK_SIZE
+from .metrics import import_duration, imported_rows
+from .time import get_next_start_time
+
+REQUIRED_FIELDS = {
+    "fighter_a", "fighter_a_club",
+    "fighter_b", "fighter_b_club",
+    "weight_class", "round_duration", "nb_rounds", "rest_time",
+    "fight_type"
+}
+
+# Error details kept in the report; rejected rows past this are only counted
+MAX_REPORTED_ERRORS = 1000
+
+_fight_rows = TypeAdapter(List[FightBase])
+
+
+class ImportReport(NamedTuple):
+    imported: int
+    rejected: int
+    errors: List[Dict]
+
+
+class MissingFieldsError(ValueError):
+    pass
+
+
+def _read_chunks(reader: csv.DictReader, size: int) -> Iterator[List[Tuple[int, Dict]]]:
+    """Yield (line number, row) lists of at most size rows, reading the file as we go."""
+    while True:
+        chunk = []
+        for row in islice(reader, size):
+            chunk.append((reader.line_num, {
+                key: value.strip() if isinstance(value, str) else value
+                for key, value in row.items() if key in REQUIRED_FIELDS
+            }))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _validate_chunk(chunk: List[Tuple[int, Dict]]) -> Tuple[List[FightBase], Dict[int, str]]:
+    """Validate a chunk of rows in one pass, returning the valid fights and the errors by row index."""
+    errors: Dict[int, str] = {}
+    try:
+        return _fight_rows.validate_python([row for _, row in chunk]), errors
+    except ValidationError as e:
+        for error in e.errors():
+            index, *field = error["loc"]
+            errors.setdefault(index, f"{field[0]}: {error['msg']}" if field else error["msg"])
+
+    # Validate the remaining rows again as one batch
+    valid_rows = [row for index, (_, row) in enumerate(chunk) if index not in errors]
+    return _fight_rows.validate_python(valid_rows), errors
+
+
+class _UploadReader(io.RawIOBase):
+    """Raw stream over a binary file object that only has read().
+
+    SpooledTemporaryFile (UploadFile.file) has no readable() before Python
+    3.11, which io.TextIOWrapper needs.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._file.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_upload(file: BinaryIO) -> TextIO:
+    """Decode an uploaded CSV file as it is read, instead of loading it whole.
+
+    Closing the returned stream leaves the upload open.
+    """
+    return io.TextIOWrapper(io.BufferedReader(_UploadReader(file)), encoding="utf-8-sig", newline="")
+
+
+def _open_reader(stream: TextIO) -> csv.DictReader:
+    reader = csv.DictReader(stream)
+    missing_fields = REQUIRED_FIELDS - set(reader.fieldnames or [])
+    if missing_fields:
+        raise MissingFieldsError(f"Missing required fields: {', '.join(sorted(missing_fields))}")
+    return reader
+
+
+def _prepare_chunks(
+    reader: csv.DictReader,
+    start_time: datetime,
+    fight_number: int,
+    chunk_size: int,
+    partition: CardPartition
+) -> Iterator[Tuple[List[Dict], List[Dict]]]:
+    """Yield the rows to insert and the rejected rows (line number and error) of each chunk"""
+    for chunk in _read_chunks(reader, chunk_size):
+        valid, chunk_errors = _validate_chunk(chunk)
+        rejected = [{"row": chunk[index][0], "error": message} for index, message in sorted(chunk_errors.items())]
+
+        rows = []
+        for fight in valid:
+            duration = compute_duration(fight.nb_rounds, fight.round_duration, fight.rest_time)
+            rows.append({
+                **fight.model_dump(),
+                "id": str(uuid.uuid4()),
+                "event_id": partition.event_id,
+                "ring_id": partition.ring_id,
+                "fight_number": fight_number,
+                "duration": duration,
+                "expected_start": start_time,
+                "is_completed": False,
+            })
+            fight_number += 1
+            start_time = get_next_start_time(start_time, duration)
+        yield rows, rejected
+
+
+class _ReportBuilder:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imported = 0
+        self.rejected = 0
+        self.errors: List[Dict] = []
+
+    def add(self, rows: List[Dict], rejected: List[Dict]) -> None:
+        self.imported += len(rows)
+        self.rejected += len(rejected)
+        # Error details are reported up to MAX_REPORTED_ERRORS, the rest only counted
+        self.errors.extend(rejected[:max(MAX_REPORTED_ERRORS - len(self.errors), 0)])
+
+    def finish(self) -> ImportReport:
+        imported_rows.inc(amount=self.imported)
+        import_duration.inc(amount=time.perf_counter() - self.started)
+        return ImportReport(self.imported, self.rejected, self.errors)
+
+
+def import_csv(
+    db: Session,
+    stream: TextIO,
+    start_time: datetime,
+    first_fight_number: int,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    partition: CardPartition = DEFAULT_PARTITION
+) -> ImportReport:
+    """Stream fights from a CSV file into a ring's card, chunk by chunk.
+
+    Rows are validated with the FightBase rules and inserted with one
+    executemany INSERT per chunk; invalid rows are reported with their line
+    number instead of being inserted. The caller owns the transaction.
+    """
+    reader = _open_reader(stream)
+    report = _ReportBuilder()
+    for rows, rejected in _prepare_chunks(reader, start_time, first_fight_number, chunk_size, partition):
+        if rows:
+            db.execute(insert(Fight), rows)
+        report.add(rows, rejected)
+    return report.finish()
+
+
+async def import_csv_async(
+    db: AsyncSession,
+    stream: TextIO,
+    start_time: datetime,
+    first_fight_number: int,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    partition: CardPartition = DEFAULT_PARTITION
+) -> ImportReport:
+    """import_csv for the routes: each chunk is read and validated in a worker
+    thread, so a large import doesn't hold up the other requests.
+    """
+    reader = await asyncio.to_thread(_open_reader, stream)
+    chunks = _prepare_chunks(reader, start_time, first_fight_number, chunk_size, partition)
+    report = _ReportBuilder()
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+        rows, rejected = chunk
+        if rows:
+            await db.execute(insert(Fight), rows)
+        report.add(rows, rejected)
+    return report.finish()
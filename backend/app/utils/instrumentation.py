@@ -0,0 +1,183 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import http_request_duration, http_request_queries, http_requests, http_requests_in_flight
+
+
+class RequestMetrics:
+    """Where the time of one request went"""
+
+    __slots__ = ("started", "queries", "sql_seconds", "serialization_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        return (
+            f'db;dur={self.sql_seconds * 1000:.2f};desc="{self.queries} queries", '
+            f"ser;dur={self.serialization_seconds * 1000:.2f}, "
+            f"total;dur={total_seconds * 1000:.2f}"
+        )
+
+
+# Metrics of the request being handled, None outside of a request
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    metrics = _current.get()
+    started = getattr(context, "_query_started", None)
+    if metrics is None or started is None:
+        return
+    metrics.queries += 1
+    metrics.sql_seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time the statements an engine runs on behalf of a request.
+
+    Pass the sync_engine of an AsyncEngine: its events run in the request's
+    context as well.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def measure_serialization() -> Iterator[None]:
+    """Add the time spent in the block, or the decorated function, to the request's serialization time"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialization_seconds += time.perf_counter() - started
+
+
+class RouteStats:
+    """Totals of the requests served by one route"""
+
+    __slots__ = ("count", "errors", "total_seconds", "max_seconds", "sql_seconds", "queries", "serialization_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.sql_seconds = 0.0
+        self.queries = 0
+        self.serialization_seconds = 0.0
+
+    def add(self, metrics: RequestMetrics, total_seconds: float, status_code: int) -> None:
+        self.count += 1
+        if status_code >= 500:
+            self.errors += 1
+        self.total_seconds += total_seconds
+        self.max_seconds = max(self.max_seconds, total_seconds)
+        self.sql_seconds += metrics.sql_seconds
+        self.queries += metrics.queries
+        self.serialization_seconds += metrics.serialization_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "queries_per_request": round(self.queries / self.count, 3),
+            "mean_ms": round(self.total_seconds / self.count * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "sql_mean_ms": round(self.sql_seconds / self.count * 1000, 3),
+            "serialization_mean_ms": round(self.serialization_seconds / self.count * 1000, 3),
+        }
+
+
+class RequestMetricsRegistry:
+    """Per-process totals, by method and route path"""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = {}
+
+    def record(self, name: str, metrics: RequestMetrics, total_seconds: float, status_code: int) -> None:
+        stats = self.routes.get(name)
+        if stats is None:
+            stats = self.routes[name] = RouteStats()
+        stats.add(metrics, total_seconds, status_code)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.snapshot() for name, stats in sorted(self.routes.items())}
+
+
+request_metrics = RequestMetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    """Time every HTTP request and report its SQL and serialization time.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so responses aren't buffered
+    and the live feed keeps streaming. The Server-Timing header is sent with
+    the response headers; the route totals and the Prometheus metrics are
+    recorded once the response is complete.
+
+    Event streams (the live feed) stay open for as long as the client
+    watches: they leave the in-flight gauge once their headers are sent and
+    are kept out of the latency totals. The live_feed_clients gauge counts them.
+    """
+
+    def __init__(self, app: ASGIApp, registry: RequestMetricsRegistry = request_metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        status_code = 500
+        streaming = False
+        http_requests_in_flight.inc()
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", metrics.server_timing(time.perf_counter() - metrics.started))
+                if headers.get("content-type", "").startswith("text/event-stream"):
+                    streaming = True
+                    http_requests_in_flight.dec()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total_seconds = time.perf_counter() - metrics.started
+            # The route template, not the path: one entry per route whatever the ids
+            route = scope.get("route")
+            method, path = scope["method"], route.path if route is not None else "(unmatched)"
+            http_requests.inc(method, path, str(status_code))
+            http_request_queries.inc(method, path, amount=metrics.queries)
+            if not streaming:
+                http_requests_in_flight.dec()
+                self.registry.record(f"{method} {path}", metrics, total_seconds, status_code)
+                http_request_duration.observe(total_seconds, method, path)
@@ -0,0 +1,320 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import DATABASE_URL, METRICS_DIR, METRICS_FLUSH_SECONDS
+from .files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a cached read to a slow import
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """A metric of this process, one value per combination of label values.
+
+    Updates are plain dict operations on the event loop, no lock is taken.
+    Values of every worker are summed when exposed.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, Any] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def samples(self) -> List[Tuple[LabelValues, Any]]:
+        return list(self._values.items())
+
+    @staticmethod
+    def merge(left: Any, right: Any) -> Any:
+        return left + right
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+
+class Histogram(Metric):
+    """Observations counted per bucket (not cumulative), followed by their sum"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._values.get(labels)
+        if counts is None:
+            # One count per bucket, one for +Inf, then the sum
+            counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> List[Tuple[LabelValues, Any]]:
+        return [(labels, list(counts)) for labels, counts in self._values.items()]
+
+    @staticmethod
+    def merge(left: List[float], right: List[float]) -> List[float]:
+        return [a + b for a, b in zip(left, right)]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """The metrics of the application, and collectors refreshing the values read from elsewhere"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Called before every collection, to set values kept by other objects"""
+        self._collectors.append(collector)
+
+    def collect(self) -> Dict[str, List]:
+        """Samples of this process, as JSON-serializable data"""
+        for collector in self._collectors:
+            collector()
+        return {name: [[list(labels), value] for labels, value in metric.samples()] for name, metric in self.metrics.items()}
+
+    def merge(self, states: Iterable[Dict[str, List]]) -> Dict[str, Dict[LabelValues, Any]]:
+        """Samples of several processes added up"""
+        merged: Dict[str, Dict[LabelValues, Any]] = {name: {} for name in self.metrics}
+        for state in states:
+            for name, samples in state.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue  # written by another version of the app
+                values = merged[name]
+                for labels, value in samples:
+                    labels = tuple(labels)
+                    values[labels] = metric.merge(values[labels], value) if labels in values else value
+        return merged
+
+    def render(self, merged: Dict[str, Dict[LabelValues, Any]]) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(merged.get(name, {}).items()):
+                if not isinstance(metric, Histogram):
+                    lines.append(f"{name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, "+Inf"), value):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else _format_value(bound)
+                    bucket_labels = _format_labels((*metric.labelnames, "le"), (*labels, le))
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                label_text = _format_labels(metric.labelnames, labels)
+                lines.append(f"{name}_sum{label_text} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{label_text} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsExporter:
+    """Metrics of every uvicorn worker, through one file per worker.
+
+    Each worker writes its samples to its own file every flush_seconds, and
+    whichever worker answers /metrics adds up the files of the live workers,
+    its own taken fresh. Nothing is shared in memory, so nothing is locked.
+    Files of workers that are gone are deleted: their counters then restart,
+    which Prometheus' rate() treats as a reset.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str, flush_seconds: float = METRICS_FLUSH_SECONDS):
+        self.registry = registry
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"worker-{pid}.json")
+
+    def flush(self) -> Dict[str, List]:
+        state = self.registry.collect()
+        write_atomic(self._path(os.getpid()), json.dumps(state, separators=(",", ":")).encode())
+        return state
+
+    def gather(self) -> List[Dict[str, List]]:
+        """Samples of every live worker, this one's fresh"""
+        states = [self.flush()]
+        for name in os.listdir(self.directory):
+            if not (name.startswith("worker-") and name.endswith(".json")):
+                continue
+            try:
+                pid = int(name[len("worker-"):-len(".json")])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if not _process_alive(pid):
+                    os.unlink(path)
+                    continue
+                with open(path, "rb") as file:
+                    states.append(json.load(file))
+            except (OSError, ValueError):
+                # Removed or replaced meanwhile
+                continue
+        return states
+
+    def render(self) -> str:
+        return self.registry.render(self.registry.merge(self.gather()))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except OSError:
+                logger.warning("Failed to write the metrics of worker %s", os.getpid(), exc_info=True)
+
+    def start(self) -> None:
+        """Write this worker's samples periodically. Must run on the event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            os.unlink(self._path(os.getpid()))
+        except FileNotFoundError:
+            pass
+
+
+def default_metrics_dir(database_url: str) -> str:
+    """Temporary directory shared by the workers using the same database"""
+    digest = hashlib.blake2b(database_url.encode(), digest_size=6).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"interclub-metrics-{digest}")
+
+
+metrics_registry = MetricsRegistry()
+metrics_exporter = MetricsExporter(metrics_registry, METRICS_DIR or default_metrics_dir(DATABASE_URL))
+
+# HTTP, fed by the request instrumentation middleware
+http_requests = metrics_registry.counter(
+    "interclub_http_requests_total", "HTTP requests served", ("method", "route", "status")
+)
+http_request_duration = metrics_registry.histogram(
+    "interclub_http_request_duration_seconds", "Time to serve an HTTP request", ("method", "route")
+)
+http_request_queries = metrics_registry.counter(
+    "interclub_http_request_sql_queries_total", "SQL statements run by HTTP requests", ("method", "route")
+)
+http_requests_in_flight = metrics_registry.gauge(
+    "interclub_http_requests_in_flight", "HTTP requests being served"
+)
+
+# Scheduling and import
+reschedule_duration = metrics_registry.histogram(
+    "interclub_reschedule_duration_seconds", "Time of one update_fight_times call"
+)
+rescheduled_rows = metrics_registry.histogram(
+    "interclub_rescheduled_rows", "Fights whose expected start one update_fight_times call changed",
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+imported_rows = metrics_registry.counter("interclub_import_rows_total", "Fights inserted by CSV imports")
+import_duration = metrics_registry.counter(
+    "interclub_import_seconds_total", "Time spent parsing and inserting CSV imports"
+)
+
+# Connections, set by collectors from the pools and the event broker
+db_pool_connections = metrics_registry.gauge(
+    "interclub_db_pool_connections", "Connections of a pool, by state", ("pool", "state")
+)
+db_pool_checkouts = metrics_registry.counter(
+    "interclub_db_pool_checkouts_total", "Connections taken from a pool", ("pool",)
+)
+db_pool_checkout_duration = metrics_registry.counter(
+    "interclub_db_pool_checkout_seconds_total", "Time connections were held out of a pool", ("pool",)
+)
+db_pool_invalidations = metrics_registry.counter(
+    "interclub_db_pool_invalidations_total", "Connections of a pool found broken", ("pool",)
+)
+live_feed_clients = metrics_registry.gauge(
+    "interclub_live_feed_clients", "Clients connected to the live feed"
+)
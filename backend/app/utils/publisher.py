@@ -0,0 +1,181 @@
+import asyncio
+import gzip
+import logging
+import os
+import re
+from typing import Callable, Optional, Set
+
+from sqlalchemy import select
+
+from ..database.database import AsyncSessionLocal
+from ..models.fight import DEFAULT_PARTITION, CardPartition, Fight
+from .config import PUBLIC_STATE_DIR, PUBLIC_STATE_NEXT_LIMIT, PUBLIC_STATE_PAST_LIMIT
+from .files import write_atomic
+from .snapshot import card_snapshot
+
+try:
+    import brotli
+except ImportError:  # optional, only the gzip variant is written without it
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, where a single worker is run anyway
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Event and ring ids used as directory names
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+
+
+def ring_state_path(directory: str, partition: CardPartition) -> Optional[str]:
+    """<event_id>/<ring_id>/state.json, None if an id isn't a safe file name"""
+    if not all(_SAFE_ID.match(part) for part in partition):
+        return None
+    return os.path.join(directory, partition.event_id, partition.ring_id, "state.json")
+
+
+def state_path(directory: str, partition: CardPartition) -> Optional[str]:
+    """File holding the public state of a ring: state.json for the default ring,
+    <event_id>/<ring_id>/state.json for the others. None if an id isn't a safe file name."""
+    if partition == DEFAULT_PARTITION:
+        return os.path.join(directory, "state.json")
+    return ring_state_path(directory, partition)
+
+
+def _read_stamp(path: str) -> Optional[float]:
+    try:
+        with open(path + ".stamp") as file:
+            return float(file.read())
+    except (OSError, ValueError):
+        return None
+
+
+def write_state_files(path: str, content: bytes, read_at: Optional[float] = None) -> bool:
+    """Write content and its pre-compressed variants, for nginx's gzip_static and brotli_static.
+
+    read_at is when the state was read from the database. The files are then
+    only replaced if they hold a state read earlier, so a slower worker never
+    overwrites a newer state. Returns whether they were written.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".lock", "a") as lock:
+        if fcntl is not None:
+            # Checking the stamp and writing are one step for the workers
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        if read_at is not None:
+            written_at = _read_stamp(path)
+            if written_at is not None and written_at >= read_at:
+                return False
+        # Variants first, the plain file last marks the new state as complete
+        write_atomic(path + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            write_atomic(path + ".br", brotli.compress(content, quality=11))
+        write_atomic(path, content)
+        if read_at is not None:
+            write_atomic(path + ".stamp", repr(read_at).encode())
+        return True
+
+
+class StatePublisher:
+    """Write the spectator state of each ring to static files whenever its card changes.
+
+    The files hold exactly what GET /fights/state answers, so public displays
+    can be served by nginx without reaching uvicorn or the database. Only the
+    worker that committed a change publishes it (see _card_changed in the
+    fights router), not every worker the change is fanned out to; a burst of
+    changes to a ring is published once.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        session_factory: Callable,
+        next_limit: int = PUBLIC_STATE_NEXT_LIMIT,
+        past_limit: int = PUBLIC_STATE_PAST_LIMIT
+    ):
+        self.directory = directory
+        self.session_factory = session_factory
+        self.next_limit = next_limit
+        self.past_limit = past_limit
+        self._pending: Set[CardPartition] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, partition: CardPartition) -> Optional[str]:
+        """Write the current state of a ring, returns the path written"""
+        path = state_path(self.directory, partition)
+        if path is None:
+            logger.warning("Not publishing ring %s: its ids aren't valid file names", partition)
+            return None
+
+        async with self.session_factory() as db:
+            snapshot = await card_snapshot.get(db, partition)
+        content = snapshot.state_view(self.next_limit, self.past_limit).content.encode()
+        # Compression and disk writes stay off the event loop
+        await asyncio.to_thread(write_state_files, path, content, snapshot.read_at)
+        if partition == DEFAULT_PARTITION:
+            # Also under its own ids, for admins built with VITE_EVENT_ID / VITE_RING_ID set to them
+            ring_path = ring_state_path(self.directory, partition)
+            if ring_path is not None:
+                await asyncio.to_thread(write_state_files, ring_path, content, snapshot.read_at)
+        return path
+
+    async def _all_partitions(self) -> Set[CardPartition]:
+        """Every ring with fights, and the default ring"""
+        async with self.session_factory() as db:
+            rows = (await db.execute(select(Fight.event_id, Fight.ring_id).distinct())).all()
+        return {CardPartition(*row) for row in rows} | {DEFAULT_PARTITION}
+
+    def notify(self, partition: CardPartition) -> None:
+        """Publish a ring soon, after a change this worker committed"""
+        self._pending.add(partition)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        try:
+            # Files may predate changes made while no worker was running
+            self._pending |= await self._all_partitions()
+        except Exception:
+            logger.exception("Failed to list the rings to publish")
+            self._pending.add(DEFAULT_PARTITION)
+        while True:
+            pending, self._pending = self._pending, set()
+            for partition in pending:
+                try:
+                    await self.publish(partition)
+                except Exception:
+                    logger.exception("Failed to publish the public state of ring %s", partition)
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Publish every ring now, then the rings this worker changes. Must run on the event loop."""
+        if self._task is not None:
+            return
+        # Created on the running loop, not at import time
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+def create_state_publisher() -> Optional[StatePublisher]:
+    """The publisher configured by PUBLIC_STATE_DIR, None when publishing is disabled"""
+    if not PUBLIC_STATE_DIR:
+        return None
+    return StatePublisher(PUBLIC_STATE_DIR, AsyncSessionLocal)
+
+
+# Static copy of the public state for nginx, when PUBLIC_STATE_DIR is set
+state_publisher = create_state_publisher()
@@ -0,0 +1,117 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TypedDict
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from ..models.fight import Fight, compute_duration
+from ..schemas.fight import LOCAL_TIMEZONE, Fight as FightSchema
+from .instrumentation import measure_serialization
+
+try:
+    import orjson
+except ImportError:  # optional, pydantic-core serializes the payloads without it
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed"""
+
+    @measure_serialization()
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FightPayload(TypedDict):
+    """JSON document of a fight, field for field what FightSchema produces"""
+    fighter_a: str
+    fighter_a_club: str
+    fighter_b: str
+    fighter_b_club: str
+    weight_class: int
+    round_duration: float
+    nb_rounds: int
+    rest_time: float
+    fight_type: str
+    id: str
+    event_id: str
+    ring_id: str
+    fight_number: int
+    expected_start: datetime
+    actual_start: Optional[datetime]
+    actual_end: Optional[datetime]
+    is_completed: bool
+    duration: float
+
+
+# Columns read from a Fight row, in FightSchema's order
+FIGHT_FIELDS = tuple(FightSchema.model_fields)
+DATETIME_FIELDS = ("expected_start", "actual_start", "actual_end")
+# Columns a client may restrict a fight list to
+PROJECTABLE_FIELDS = FIGHT_FIELDS + ("duration",)
+
+_payload_adapter = TypeAdapter(FightPayload)
+_payload_list_adapter = TypeAdapter(List[FightPayload])
+_partial_list_adapter = TypeAdapter(List[Dict[str, Any]])
+
+
+def fight_payload(fight: Fight) -> FightPayload:
+    """Payload of a Fight row, without validation: the row already holds valid values"""
+    # Read the loaded values directly, going through the instrumented attributes
+    # costs more than the serialization itself
+    state = fight.__dict__
+    try:
+        payload = {field: state[field] for field in FIGHT_FIELDS}
+    except KeyError:
+        # Expired or deferred attributes are loaded on access
+        payload = {field: getattr(fight, field) for field in FIGHT_FIELDS}
+
+    for field in DATETIME_FIELDS:
+        value = payload[field]
+        # Naive datetimes are in local time, as FightSchema serializes them
+        if value is not None and value.tzinfo is None:
+            payload[field] = value.replace(tzinfo=LOCAL_TIMEZONE)
+    payload["duration"] = compute_duration(payload["nb_rounds"], payload["round_duration"], payload["rest_time"])
+    return payload
+
+
+def fight_json(fight: Fight) -> str:
+    """JSON of a single fight"""
+    payload = fight_payload(fight)
+    if orjson is not None:
+        return orjson.dumps(payload).decode()
+    return _payload_adapter.dump_json(payload, warnings=False).decode()
+
+
+@measure_serialization()
+def dump_fights(fights: Iterable[Fight]) -> bytes:
+    """JSON array of fights, serialized in one pass"""
+    payloads = [fight_payload(fight) for fight in fights]
+    if orjson is not None:
+        return orjson.dumps(payloads)
+    return _payload_list_adapter.dump_json(payloads, warnings=False)
+
+
+@measure_serialization()
+def dump_partial_fights(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """JSON array of partial fights, from rows holding the values of fields in that order"""
+    datetime_fields = [field for field in fields if field in DATETIME_FIELDS]
+    payloads = []
+    for row in rows:
+        payload = dict(zip(fields, row))
+        for field in datetime_fields:
+            value = payload[field]
+            if value is not None and value.tzinfo is None:
+                payload[field] = value.replace(tzinfo=LOCAL_TIMEZONE)
+        payloads.append(payload)
+    if orjson is not None:
+        return orjson.dumps(payloads)
+    return _partial_list_adapter.dump_json(payloads, warnings=False)
+
+
+def fights_response(fights: Iterable[Fight]) -> Response:
+    """Response for a list of fights, bypassing FastAPI's validation and jsonable_encoder"""
+    return Response(content=dump_fights(fights), media_type="application/json")
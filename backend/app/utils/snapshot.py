@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.fight import DEFAULT_PARTITION, CardPartition, Fight
+from .config import CARD_SNAPSHOT_MAX_AGE_SECONDS
+from .instrumentation import measure_serialization
+from .serialization import fight_json
+
+
+def _json_list(items: List[str]) -> str:
+    return "[" + ",".join(items) + "]"
+
+
+class CardView(NamedTuple):
+    """Serialized payload of a read endpoint together with its strong ETag"""
+    content: str
+    etag: str
+
+    @classmethod
+    def from_content(cls, content: str) -> "CardView":
+        digest = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+        return cls(content, f'"{digest}"')
+
+
+class CardSnapshot:
+    """Immutable view of the whole fight card, built from one ordered scan of the table.
+
+    Every fight is serialized through FightSchema exactly once; the read
+    endpoints only slice and join the pre-serialized JSON.
+    """
+
+    def __init__(self, version: int, fights: List[Fight], read_at: Optional[float] = None):
+        self.version = version
+        self.built_at = time.monotonic()
+        # Wall-clock time the card was read at, comparable between the workers
+        self.read_at = read_at if read_at is not None else time.time()
+
+        ongoing: Optional[str] = None
+        pending: List[str] = []
+        completed = []
+        by_id = {}
+
+        # fights are ordered by fight_number
+        for fight in fights:
+            data = fight_json(fight)
+            by_id[fight.id] = data
+
+            if fight.actual_start is not None and fight.actual_end is None:
+                if ongoing is None:
+                    ongoing = data
+            elif fight.actual_start is None and not fight.is_completed:
+                pending.append(data)
+            elif fight.is_completed and fight.actual_end is not None:
+                completed.append((fight.actual_end, data))
+
+        schedule = sorted(fights, key=lambda f: (f.expected_start or datetime.min, f.fight_number))
+        completed.sort(key=lambda item: item[0], reverse=True)
+
+        self.fight_count = len(fights)
+        self._all = [by_id[f.id] for f in schedule]
+        self._ongoing = ongoing
+        self._ready = pending[0] if pending else None
+        self._upcoming = pending[1:]
+        self._past = [data for _, data in completed]
+        self._views: Dict[Tuple, CardView] = {}
+
+    def _view(self, key: Tuple, build: Callable[[], str]) -> CardView:
+        # Payloads and their hashes are computed at most once per snapshot
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = CardView.from_content(build())
+        return view
+
+    def all_view(self) -> CardView:
+        """Every fight, ordered by expected start"""
+        return self._view(("all",), lambda: _json_list(self._all))
+
+    def ongoing_view(self) -> CardView:
+        return self._view(("ongoing",), lambda: self._ongoing or "null")
+
+    def ready_view(self) -> CardView:
+        return self._view(("ready",), lambda: self._ready or "null")
+
+    def next_view(self, limit: int) -> CardView:
+        """Fights after the ready one, in card order"""
+        limit = max(limit, 0)
+        return self._view(("next", limit), lambda: _json_list(self._upcoming[:limit]))
+
+    def past_view(self, limit: int) -> CardView:
+        """Completed fights, most recently ended first"""
+        limit = max(limit, 0)
+        return self._view(("past", limit), lambda: _json_list(self._past[:limit]))
+
+    def state_view(self, next_limit: int, past_limit: int) -> CardView:
+        """Ongoing, ready, next and past views combined in a single payload"""
+        def build() -> str:
+            return (
+                f'{{"ongoing":{self.ongoing_view().content},'
+                f'"ready":{self.ready_view().content},'
+                f'"next":{self.next_view(next_limit).content},'
+                f'"past":{self.past_view(past_limit).content}}}'
+            )
+        return self._view(("state", next_limit, past_limit), build)
+
+
+class CardSnapshotCache:
+    """Per-process cache of the current CardSnapshot of each ring.
+
+    Mutating routes call invalidate() after they commit, which bumps the card
+    version; the ring's snapshot is rebuilt lazily on the next read. Changes
+    committed by another worker process arrive through the card fanout, and
+    snapshots also expire after CARD_SNAPSHOT_MAX_AGE_SECONDS in case one is missed.
+    """
+
+    def __init__(self, max_age: float = CARD_SNAPSHOT_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        # Incremented on every change of any ring
+        self.version = 0
+        # Version of the last change of each ring, and of the last change of every ring
+        self._versions: Dict[CardPartition, int] = {}
+        self._all_version = 0
+        self._snapshots: Dict[CardPartition, CardSnapshot] = {}
+        # Rebuild lock of each ring, with the event loop it belongs to
+        self._locks: Dict[CardPartition, Tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = {}
+
+    def invalidate(self, partition: Optional[CardPartition] = None, version: int = 0) -> int:
+        """Drop the snapshot of a ring, or of every ring, and return the new version.
+
+        version is the one another worker gave the change: the new version is
+        at least that, so versions keep increasing across workers.
+        """
+        self.version = max(self.version + 1, version)
+        if partition is None:
+            # Every ring's version moves on, so no snapshot read before is kept
+            self._all_version = self.version
+            self._snapshots = {}
+        else:
+            self._versions[partition] = self.version
+            self._snapshots.pop(partition, None)
+        return self.version
+
+    def _version(self, partition: CardPartition) -> int:
+        return max(self._versions.get(partition, 0), self._all_version)
+
+    def _cached(self, partition: CardPartition) -> Optional[CardSnapshot]:
+        snapshot = self._snapshots.get(partition)
+        if (
+            snapshot is not None
+            and snapshot.version == self._version(partition)
+            and time.monotonic() - snapshot.built_at < self.max_age
+        ):
+            return snapshot
+        return None
+
+    def _lock(self, partition: CardPartition) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        entry = self._locks.get(partition)
+        if entry is None or entry[0] is not loop:
+            entry = self._locks[partition] = (loop, asyncio.Lock())
+        return entry[1]
+
+    async def get(self, db: AsyncSession, partition: CardPartition = DEFAULT_PARTITION) -> CardSnapshot:
+        snapshot = self._cached(partition)
+        if snapshot is not None:
+            return snapshot
+
+        # One rebuild per ring at a time: readers arriving meanwhile (every live
+        # feed client refetches after a change) wait for it rather than scan too
+        async with self._lock(partition):
+            snapshot = self._cached(partition)
+            if snapshot is not None:
+                return snapshot
+
+            version = self._version(partition)
+            read_at = time.time()
+            fights = (await db.scalars(
+                select(Fight).where(Fight.in_partition(partition)).order_by(Fight.fight_number)
+            )).all()
+            with measure_serialization():
+                snapshot = CardSnapshot(version, fights, read_at)
+            # Only keep it if no mutation was committed while we were reading
+            if version == self._version(partition):
+                self._snapshots[partition] = snapshot
+            return snapshot
+
+
+card_snapshot = CardSnapshotCache()
@@ -1,39 +1,166 @@
+import time
 from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import DateTime, func, literal, select, update
 from sqlalchemy.orm import Session
-from ..models.fight import Fight
+from ..models.fight import DEFAULT_PARTITION, CardPartition, Fight
 from .config import FIGHT_DURATION_BUFFER_MINUTES
+from .metrics import reschedule_duration, rescheduled_rows
 
-def get_next_start_time(current_time: datetime, duration: int) -> datetime:
+def get_next_start_time(current_time: datetime, duration: float) -> datetime:
     """Calculate the next available start time based on current time and duration."""
     return current_time + timedelta(minutes=duration + FIGHT_DURATION_BUFFER_MINUTES)
 
-def update_fight_times(db: Session, start_time: datetime, min_fight_number: int = 0):
-    """Update expected start times for all fights from a given fight number."""
-    try:
-        # Get all non-started fights ordered by fight number
-        fights = db.query(Fight).filter(
-            Fight.fight_number >= min_fight_number,
-            Fight.actual_start.is_(None)
-        ).order_by(Fight.fight_number).all()
-
-        if not fights:
-            return
-
-        current_time = start_time
-        for fight in fights:
-            fight.expected_start = current_time
-            current_time = get_next_start_time(current_time, fight.duration)
-
-        db.commit()
-        return fights
-    except Exception as e:
-        db.rollback()
-        raise e
-
-def update_subsequent_fights(db: Session, reference_fight: Fight, start_time: datetime):
-    """Update expected start times for all fights after the reference fight."""
+def compute_start_times(
+    durations: Sequence[float],
+    anchor: datetime,
+    buffer_minutes: float = FIGHT_DURATION_BUFFER_MINUTES
+) -> List[datetime]:
+    """Start times of consecutive fights, the first one starting at anchor.
+
+    Each fight starts after the previous one's duration plus the buffer, so the
+    start times are a prefix sum over the durations.
+    """
+    if not durations:
+        return []
+    offsets = accumulate((duration + buffer_minutes for duration in durations[:-1]), initial=0)
+    return [anchor + timedelta(minutes=offset) for offset in offsets]
+
+def update_fight_times(
+    db: Session,
+    start_time: datetime,
+    min_fight_number: int = 0,
+    partition: CardPartition = DEFAULT_PARTITION
+) -> Dict[str, datetime]:
+    """Reschedule the non-started fights of a ring from a given fight number, the first one at start_time.
+
+    Only the rows whose expected start actually changes are written, in a single
+    bulk UPDATE. The caller owns the transaction. Returns the new expected start
+    of every rescheduled fight, by id.
+    """
+    # Pending changes (started fight, renumbering, new fight) must be visible to the query
+    db.flush()
+
+    started = time.perf_counter()
+    if db.get_bind().dialect.name == "postgresql":
+        changes = _update_fight_times_windowed(db, start_time, min_fight_number, partition)
+    else:
+        changes = _update_fight_times_bulk(db, start_time, min_fight_number, partition)
+    reschedule_duration.observe(time.perf_counter() - started)
+    rescheduled_rows.observe(len(changes))
+    return changes
+
+def _update_fight_times_bulk(
+    db: Session,
+    start_time: datetime,
+    min_fight_number: int,
+    partition: CardPartition
+) -> Dict[str, datetime]:
+    """Prefix sum computed in Python, changed rows written in one executemany UPDATE"""
+    fights = db.query(
+        Fight.id,
+        Fight.duration,
+        Fight.expected_start
+    ).filter(
+        Fight.in_partition(partition),
+        Fight.fight_number >= min_fight_number,
+        Fight.actual_start.is_(None)
+    ).order_by(Fight.fight_number).all()
+
+    if not fights:
+        return {}
+
+    start_times = compute_start_times([fight.duration for fight in fights], start_time)
+    changes = {
+        fight.id: expected_start
+        for fight, expected_start in zip(fights, start_times)
+        if fight.expected_start != expected_start
+    }
+    if changes:
+        db.execute(
+            update(Fight),
+            [{"id": fight_id, "expected_start": expected_start} for fight_id, expected_start in changes.items()]
+        )
+    return changes
+
+def _update_fight_times_windowed(
+    db: Session,
+    start_time: datetime,
+    min_fight_number: int,
+    partition: CardPartition
+) -> Dict[str, datetime]:
+    """PostgreSQL version of update_fight_times: the prefix sum runs as a window function
+    inside one UPDATE ... FROM, and only the rows that change are written."""
+    slot = Fight.duration + FIGHT_DURATION_BUFFER_MINUTES
+    offsets = select(
+        Fight.id.label("id"),
+        # Minutes from the anchor: sum of the slots of the fights before this one
+        (func.sum(slot).over(order_by=Fight.fight_number, rows=(None, 0)) - slot).label("offset")
+    ).where(
+        Fight.in_partition(partition),
+        Fight.fight_number >= min_fight_number,
+        Fight.actual_start.is_(None)
+    ).subquery()
+
+    new_start = literal(start_time, DateTime) + func.make_interval(0, 0, 0, 0, 0, 0, offsets.c.offset * 60)
+    rows = db.execute(
+        update(Fight)
+        .where(Fight.id == offsets.c.id)
+        .where(Fight.expected_start.is_distinct_from(new_start))
+        .values(expected_start=new_start)
+        .returning(Fight.id, Fight.expected_start)
+        .execution_options(synchronize_session=False)
+    ).all()
+    return {row.id: row.expected_start for row in rows}
+
+def update_subsequent_fights(db: Session, reference_fight: Fight, start_time: datetime) -> Dict[str, datetime]:
+    """Update expected start times for all fights after the reference fight, in its ring."""
     return update_fight_times(
         db,
         start_time,
-        min_fight_number=reference_fight.fight_number + 1
+        min_fight_number=reference_fight.fight_number + 1,
+        partition=CardPartition(reference_fight.event_id, reference_fight.ring_id)
     )
+
+def get_schedule_anchor(
+    db: Session,
+    partition: CardPartition = DEFAULT_PARTITION
+) -> Optional[Tuple[datetime, int]]:
+    """Where the schedule of a ring's non-started fights begins, as (start time, first fight number).
+
+    Right after the ongoing fight if there is one, otherwise at the current
+    expected start of the first non-started fight. None when nothing is left to schedule.
+    """
+    ongoing_fight = db.query(Fight).filter(
+        Fight.in_partition(partition),
+        Fight.actual_start.isnot(None),
+        Fight.actual_end.is_(None)
+    ).first()
+    if ongoing_fight:
+        return (
+            get_next_start_time(ongoing_fight.actual_start, ongoing_fight.duration),
+            ongoing_fight.fight_number + 1
+        )
+
+    first_fight = db.query(Fight).filter(
+        Fight.in_partition(partition),
+        Fight.is_completed == False,
+        Fight.actual_start.is_(None)
+    ).order_by(Fight.fight_number).first()
+    if first_fight and first_fight.expected_start:
+        return first_fight.expected_start, first_fight.fight_number
+
+    return None
+
+def reschedule_card(
+    db: Session,
+    anchor: Optional[Tuple[datetime, int]] = None,
+    partition: CardPartition = DEFAULT_PARTITION
+) -> Dict[str, datetime]:
+    """Reschedule a ring's non-started fights from the given anchor, or from the current one."""
+    anchor = anchor or get_schedule_anchor(db, partition)
+    if anchor is None:
+        return {}
+    start_time, min_fight_number = anchor
+    return update_fight_times(db, start_time, min_fight_number, partition)
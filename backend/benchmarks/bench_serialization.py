@@ -0,0 +1,90 @@
+"""Serialization time of fight lists, FastAPI's default path versus app/utils/serialization.py.
+
+    python -m benchmarks.bench_serialization --sizes 1000 10000
+
+Fights are built in memory, no database is involved:
+
+- response_model: what FastAPI does for ``response_model=List[FightSchema]``,
+  validating every ORM row then going through jsonable_encoder and json.dumps
+- validate+dump: one model_validate(...).model_dump_json() per fight, as the
+  card snapshot used to
+- dump_fights: payloads read from the rows without validation, dumped in one
+  pass by orjson, or by pydantic-core with --no-orjson
+- fight_json: dump_fights' per-fight variant, used by the card snapshot
+"""
+import argparse
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.fight import Fight
+from app.schemas.fight import Fight as FightSchema
+from app.utils import serialization
+from app.utils.serialization import dump_fights, fight_json
+
+from .common import FIGHT_TYPES, format_stats, measure
+
+
+def build_fights(nb_fights: int) -> List[Fight]:
+    start = datetime(2026, 1, 1, 14, 0)
+    fights = []
+    for number in range(1, nb_fights + 1):
+        fights.append(Fight(
+            id=str(uuid.uuid4()),
+            event_id="bench",
+            ring_id="1",
+            fight_number=number,
+            fighter_a=f"Fighter {number}A",
+            fighter_a_club=f"Club {number % 17}",
+            fighter_b=f"Fighter {number}B",
+            fighter_b_club=f"Club {number % 13}",
+            weight_class=50 + number % 40,
+            round_duration=1.5 + number % 2,
+            nb_rounds=2 + number % 3,
+            rest_time=1.0,
+            fight_type=FIGHT_TYPES[number % len(FIGHT_TYPES)],
+            expected_start=start + timedelta(minutes=10 * number),
+            actual_start=None,
+            actual_end=None,
+            is_completed=False,
+        ))
+    return fights
+
+
+def candidates(fights: List[Fight], list_adapter: TypeAdapter) -> Dict[str, Callable[[], object]]:
+    """The serializations compared, each bound to the same fights"""
+    return {
+        "response_model": lambda: json.dumps(
+            jsonable_encoder(list_adapter.validate_python(fights, from_attributes=True))
+        ).encode(),
+        "validate+dump": lambda: "[" + ",".join(
+            FightSchema.model_validate(fight).model_dump_json() for fight in fights
+        ) + "]",
+        "dump_fights": lambda: dump_fights(fights),
+        "fight_json": lambda: "[" + ",".join(fight_json(fight) for fight in fights) + "]",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-orjson", action="store_true", help="serialize as if orjson was not installed")
+    args = parser.parse_args()
+
+    if args.no_orjson:
+        serialization.orjson = None
+    list_adapter = TypeAdapter(List[FightSchema])
+
+    for nb_fights in args.sizes:
+        print(f"\n{nb_fights} fights")
+        for name, fn in candidates(build_fights(nb_fights), list_adapter).items():
+            print(f"  {name:15} {format_stats(measure(fn, args.repeat))}")
+
+
+if __name__ == "__main__":
+    main()
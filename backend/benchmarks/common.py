@@ -0,0 +1,83 @@
+"""Helpers shared by the benchmark scripts.
+
+Run the scripts from the backend directory, e.g. ``python -m benchmarks.bench_indexes``.
+"""
+import math
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.fight import Fight, compute_duration
+from app.utils.time import compute_start_times
+
+FIGHT_TYPES = ["Muay Thai", "K1", "Kick Boxing", "Boxe"]
+
+
+def seed_card(db: Session, nb_fights: int, completed_ratio: float = 0.4) -> None:
+    """Insert a card of nb_fights fights: a share of them completed, one ongoing, the rest pending."""
+    start = datetime.now().replace(hour=14, minute=0, second=0, microsecond=0)
+    nb_completed = int(nb_fights * completed_ratio)
+    rows: List[Dict] = []
+    for number in range(1, nb_fights + 1):
+        nb_rounds = 2 + number % 3
+        round_duration = 1.5 + number % 2
+        rest_time = 1.0
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "fight_number": number,
+            "fighter_a": f"Fighter {number}A",
+            "fighter_a_club": f"Club {number % 17}",
+            "fighter_b": f"Fighter {number}B",
+            "fighter_b_club": f"Club {number % 13}",
+            "weight_class": 50 + number % 40,
+            "round_duration": round_duration,
+            "nb_rounds": nb_rounds,
+            "rest_time": rest_time,
+            "duration": compute_duration(nb_rounds, round_duration, rest_time),
+            "fight_type": FIGHT_TYPES[number % len(FIGHT_TYPES)],
+            "is_completed": False,
+        })
+
+    starts = compute_start_times([row["duration"] for row in rows], start)
+    for index, (row, expected_start) in enumerate(zip(rows, starts)):
+        row["expected_start"] = expected_start
+        if index < nb_completed:
+            row["actual_start"] = expected_start
+            row["actual_end"] = expected_start + timedelta(minutes=row["duration"])
+            row["is_completed"] = True
+        elif index == nb_completed:
+            row["actual_start"] = expected_start
+
+    for offset in range(0, len(rows), 1000):
+        db.execute(insert(Fight), rows[offset:offset + 1000])
+    db.commit()
+
+
+def measure(fn: Callable[[], object], repeat: int = 200) -> Dict[str, float]:
+    """Run fn repeatedly and return latency statistics in milliseconds."""
+    fn()  # warm up caches and prepared statements
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[int(len(samples) * 0.95) - 1],
+        "mean": statistics.fmean(samples),
+    }
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    return samples[max(math.ceil(len(samples) * fraction) - 1, 0)]
+
+
+def format_stats(stats: Dict[str, float]) -> str:
+    return "  ".join(f"{name}={value:.3f}ms" for name, value in stats.items())
@@ -1,25 +1,39 @@
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from app.database.database import Base, get_db
+from app.database.database import Base, get_async_db, get_db
 from app.main import app
+from app.utils.instrumentation import instrument_engine
+from app.utils.snapshot import card_snapshot
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# File-based SQLite database for testing: the tests write through a sync session
+# while the routes read through the async engine, both must see the same data
+SQLITE_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
+    f"sqlite:///{SQLITE_PATH}",
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Each TestClient runs its own event loop, so async connections are never pooled
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{SQLITE_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+# Counted in Server-Timing and /metrics like the application's engines
+instrument_engine(async_engine.sync_engine)
+
 @pytest.fixture
 def db_session():
     Base.metadata.create_all(bind=engine)
+    # Fights are inserted directly in some tests, never serve a stale card
+    card_snapshot.invalidate()
     try:
         db = TestingSessionLocal()
         yield db
@@ -27,6 +41,11 @@ def db_session():
         db.close()
         Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture
+def async_session_factory(db_session):
+    """Sessions on the test database, for code that opens its own"""
+    return TestingAsyncSessionLocal
+
 @pytest.fixture
 def client(db_session):
     def override_get_db():
@@ -35,7 +54,12 @@ def client(db_session):
         finally:
             db_session.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.utils import auth
+from app.utils.auth import JWT_SECRET, TokenCache, decode_token, token_cache
+
+def _token(expires_in: timedelta, secret: str = JWT_SECRET) -> str:
+    return jwt.encode({"sub": "admin", "exp": datetime.utcnow() + expires_in}, secret, algorithm="HS256")
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+def test_verified_tokens_are_cached(monkeypatch):
+    token = _token(timedelta(hours=1))
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *args, **kw: calls.append(1) or real_decode(*args, **kw))
+
+    for _ in range(5):
+        assert decode_token(token)["sub"] == "admin"
+    assert len(calls) == 1
+
+def test_cached_token_expires_with_its_exp_claim(monkeypatch):
+    cache = TokenCache(maxsize=10, ttl=3600)
+    cache.put("token", {"sub": "admin", "exp": 1000})
+    monkeypatch.setattr(auth.time, "time", lambda: 999.0)
+    assert cache.get("token") == {"sub": "admin", "exp": 1000}
+    monkeypatch.setattr(auth.time, "time", lambda: 1000.0)
+    assert cache.get("token") is None
+
+def test_token_cache_is_bounded():
+    cache = TokenCache(maxsize=2, ttl=3600)
+    exp = datetime.utcnow().timestamp() + 3600
+    for token in ("a", "b", "c"):
+        cache.put(token, {"exp": exp})
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+
+@pytest.mark.parametrize("token, detail", [
+    (_token(timedelta(minutes=-1)), "Token has expired"),
+    (_token(timedelta(hours=1), secret="another-secret"), "Invalid token"),
+    (jwt.encode({"sub": "admin"}, JWT_SECRET, algorithm="HS256"), "Invalid token"),
+    ("not-a-token", "Invalid token"),
+])
+def test_rejected_tokens(token, detail):
+    with pytest.raises(HTTPException) as error:
+        decode_token(token)
+    assert error.value.status_code == 401
+    assert error.value.detail == detail
+
+def test_protected_route_rejects_invalid_token(client):
+    response = client.post("/fights/refresh-times", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+
+def test_failed_login_never_logs_the_admin_username(client, caplog, capsys):
+    from app.utils.config import ADMIN_USERNAME
+
+    with caplog.at_level("INFO", logger="app.routers.auth"):
+        response = client.post("/auth/login", data={"username": "intruder", "password": "guess"})
+    assert response.status_code == 401
+    assert "intruder" in caplog.text
+    assert ADMIN_USERNAME not in caplog.text + capsys.readouterr().out
@@ -0,0 +1,62 @@
+from app.database.database import get_async_database_url
+
+def test_async_database_url_uses_asyncio_drivers():
+    assert get_async_database_url("postgresql://user:secret@db/fightdb") == "postgresql+asyncpg://user:secret@db/fightdb"
+    assert get_async_database_url("postgresql+psycopg2://user@db/fightdb") == "postgresql+asyncpg://user@db/fightdb"
+    assert get_async_database_url("sqlite:///./fights.db") == "sqlite+aiosqlite:///./fights.db"
+
+def test_engine_options_follow_pool_settings(monkeypatch):
+    from app.database import pool
+
+    monkeypatch.setattr(pool, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    options = pool.engine_options("postgresql://user@db/fightdb")
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert pool.engine_options("postgresql+asyncpg://user@db/fightdb")["connect_args"] == {
+        "server_settings": {"statement_timeout": "5000"}
+    }
+
+    # PgBouncer: no prepared statements, no startup parameters
+    monkeypatch.setattr(pool, "DB_PGBOUNCER", True)
+    assert "connect_args" not in pool.engine_options("postgresql://user@db/fightdb")
+    connect_args = pool.engine_options("postgresql+asyncpg://user@db/fightdb")["connect_args"]
+    assert connect_args["statement_cache_size"] == connect_args["prepared_statement_cache_size"] == 0
+    assert "server_settings" not in connect_args
+
+def test_pool_metrics_count_checkouts(tmp_path):
+    from sqlalchemy import create_engine, text
+    from app.database.pool import PoolMetrics
+
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db")
+    metrics = PoolMetrics(engine)
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    stats = metrics.snapshot()
+    assert stats["checkouts"] == 3
+    assert stats["connects"] == 1
+    assert stats["checkedout"] == 0
+    engine.dispose()
+
+def test_schema_is_upgraded_once(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine, inspect
+    from app.database import database, schema
+
+    engine = create_engine(f"sqlite:///{tmp_path}/schema.db")
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(schema, "engine", engine)
+    upgrades = []
+    real_create_tables = schema.create_tables
+    monkeypatch.setattr(schema, "create_tables", lambda: upgrades.append(1) or real_create_tables())
+
+    assert schema.stored_fingerprint() is None
+    assert schema.ensure_schema() is True
+    assert {"fights", "fight_history", "users"} <= set(inspect(engine).get_table_names())
+    assert schema.stored_fingerprint() == schema.schema_fingerprint()
+
+    # Workers starting afterwards only read the fingerprint
+    assert schema.ensure_schema() is False
+    assert schema.ensure_schema(force=True) is True
+    assert len(upgrades) == 2
+    engine.dispose()
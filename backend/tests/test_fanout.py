@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from app.models.fight import CardPartition
+from app.utils.events import card_events
+from app.utils.fanout import CardFanout, FileNotifyBackend, card_fanout
+from app.utils.snapshot import card_snapshot
+from tests.test_fights import _add_fight
+
+def _change(origin, version, ring_id="2"):
+    return json.dumps({
+        "origin": origin,
+        "reason": "fight_started",
+        "version": version,
+        "event_id": "gala",
+        "ring_id": ring_id,
+    })
+
+def test_file_backend_relays_changes_between_workers(tmp_path):
+    path = str(tmp_path / "card.log")
+    first, second = FileNotifyBackend(path, max_bytes=40), FileNotifyBackend(path, max_bytes=40)
+    received_by_first, received_by_second = [], []
+
+    async def scenario():
+        await first.start(received_by_first.append)
+        await second.start(received_by_second.append)
+        try:
+            first.send('{"change":1,"padding":"................"}')
+            second.poll()
+            first.poll()
+            # Past max_bytes the next change goes to a new file
+            second.send('{"change":2}')
+            second.poll()
+        finally:
+            await first.stop()
+            await second.stop()
+
+    asyncio.run(scenario())
+    assert received_by_first == ['{"change":1,"padding":"................"}']
+    # The new file is announced as a possible loss, then read from its start
+    assert received_by_second == ['{"change":1,"padding":"................"}', None, '{"change":2}']
+
+def test_fanout_applies_changes_of_other_workers():
+    fanout = CardFanout()
+    fanout.origin = "host:1"
+    ring = CardPartition("gala", "2")
+
+    async def scenario():
+        ring_feed = card_events.subscribe(ring)
+        other_feed = card_events.subscribe(CardPartition("gala", "3"))
+        try:
+            # This worker's own changes come back from the backend, they are already applied
+            fanout.receive(_change("host:1", 10**6))
+            assert ring_feed.empty()
+
+            fanout.receive(_change("host:2", card_snapshot.version + 50))
+            event = ring_feed.get_nowait()
+            assert event["reason"] == "fight_started"
+            assert event["version"] == card_snapshot.version
+            assert (event["event_id"], event["ring_id"]) == ("gala", "2")
+            assert other_feed.empty()
+
+            # Versions only go up, even when another worker is behind
+            fanout.receive(_change("host:3", 1))
+            assert ring_feed.get_nowait()["version"] == event["version"] + 1
+
+            fanout.receive("not json")
+            assert ring_feed.empty()
+
+            # Possibly lost changes: every ring is told to re-read its card
+            fanout.receive(None)
+            assert ring_feed.get_nowait()["reason"] == "card_resync"
+            assert other_feed.get_nowait()["reason"] == "card_resync"
+        finally:
+            card_events.unsubscribe(ring_feed)
+            card_events.unsubscribe(other_feed)
+
+    asyncio.run(scenario())
+
+def test_mutations_are_sent_to_other_workers(client, db_session):
+    _add_fight(db_session, 1, id="ring2-1", ring_id="2", is_completed=False)
+    db_session.commit()
+    sent = []
+
+    class RecordingBackend:
+        def send(self, payload):
+            sent.append(json.loads(payload))
+
+    backend, card_fanout.backend = card_fanout.backend, RecordingBackend()
+    try:
+        assert client.post("/fights/ring2-1/start?ring_id=2").status_code == 200
+    finally:
+        card_fanout.backend = backend
+
+    assert len(sent) == 1
+    assert sent[0]["origin"] == card_fanout.origin
+    assert sent[0]["reason"] == "fight_started"
+    assert (sent[0]["event_id"], sent[0]["ring_id"]) == ("default", "2")
+    assert sent[0]["version"] == card_snapshot.version
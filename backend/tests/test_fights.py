@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 import pytest
 from app.models.fight import Fight
+from app.utils.snapshot import card_snapshot
 
 def test_list_fights_empty(client):
     response = client.get("/fights")
@@ -8,8 +9,8 @@ def test_list_fights_empty(client):
     assert response.json() == []
 
 def test_create_fight_via_import(client, db_session):
-    csv_content = """fighter_a,fighter_a_club,fighter_b,fighter_b_club,weight_class,duration
-John Doe,Club A,Jane Smith,Club B,75,3"""
+    csv_content = """fighter_a,fighter_a_club,fighter_b,fighter_b_club,weight_class,round_duration,nb_rounds,rest_time,fight_type
+John Doe,Club A,Jane Smith,Club B,75,2,3,1,Muay Thai"""
 
     response = client.post(
         "/fights/import",
@@ -26,7 +27,7 @@ John Doe,Club A,Jane Smith,Club B,75,3"""
     assert fight["fighter_a"] == "John Doe"
     assert fight["fighter_b"] == "Jane Smith"
     assert fight["weight_class"] == 75
-    assert fight["duration"] == 3
+    assert fight["duration"] == 8
 
 def test_start_fight(client, db_session):
     # Create a fight
@@ -38,7 +39,9 @@ def test_start_fight(client, db_session):
         fighter_b="Fighter B",
         fighter_b_club="Club B",
         weight_class=70,
-        duration=3,
+        round_duration=2,
+        nb_rounds=3,
+        rest_time=1,
         expected_start=datetime.now(),
         is_completed=False
     )
@@ -66,7 +69,9 @@ def test_end_fight(client, db_session):
         fighter_b="Fighter B",
         fighter_b_club="Club B",
         weight_class=70,
-        duration=3,
+        round_duration=2,
+        nb_rounds=3,
+        rest_time=1,
         expected_start=start_time,
         actual_start=start_time,
         is_completed=False
@@ -83,3 +88,386 @@ def test_end_fight(client, db_session):
     assert ended_fight["actual_start"] is not None
     assert ended_fight["actual_end"] is not None
     assert ended_fight["is_completed"]
+
+def test_card_event_broker_keeps_latest_event():
+    import asyncio
+    from app.utils.events import CardEventBroker
+
+    async def scenario():
+        broker = CardEventBroker()
+        queue = broker.subscribe()
+        broker.publish("fight_started")
+        broker.publish("fight_ended")
+        event = await queue.get()
+        broker.unsubscribe(queue)
+        return broker, event
+
+    broker, event = asyncio.run(scenario())
+    assert event == {"version": 2, "reason": "fight_ended"}
+    assert broker.subscriber_count == 0
+
+def test_live_feed_starts_from_the_ring_version():
+    from app.utils.events import CardEventBroker
+
+    broker = CardEventBroker()
+    broker.publish("fight_started", partition=("gala", "1"))
+    broker.publish("fight_ended", partition=("gala", "2"))
+    broker.publish("fight_started", partition=("gala", "1"))
+
+    assert broker.current_event(("gala", "2")) == {
+        "version": 2, "reason": "fight_ended", "event_id": "gala", "ring_id": "2"
+    }
+    assert broker.current_event(("gala", "3"))["version"] == 0
+    # A resync concerns every ring
+    broker.publish("card_resync")
+    assert broker.current_event(("gala", "2"))["version"] == broker.current_event(("gala", "3"))["version"] == 4
+
+def test_mutation_publishes_card_event(client):
+    from app.utils.events import card_events
+
+    version = card_snapshot.version
+    response = client.delete("/fights")
+    assert response.status_code == 200
+    assert card_snapshot.version == card_events.version == version + 1
+    assert card_events.last_reason == "fights_cleared"
+
+def _add_fight(db_session, fight_number, **kwargs):
+    kwargs.setdefault("id", f"fight-{fight_number}")
+    kwargs.setdefault("expected_start", datetime(2026, 1, 1, 18, 0) + timedelta(minutes=10 * fight_number))
+    fight = Fight(
+        fight_number=fight_number,
+        fighter_a="Fighter A",
+        fighter_a_club="Club A",
+        fighter_b="Fighter B",
+        fighter_b_club="Club B",
+        weight_class=70,
+        round_duration=2,
+        nb_rounds=3,
+        rest_time=1,
+        fight_type="Muay Thai",
+        **kwargs
+    )
+    db_session.add(fight)
+    return fight
+
+def test_card_views_are_served_from_snapshot(client, db_session):
+    start = datetime(2026, 1, 1, 18, 0)
+    _add_fight(db_session, 1, actual_start=start, actual_end=start + timedelta(minutes=9),
+               is_completed=True)
+    _add_fight(db_session, 2, actual_start=start + timedelta(minutes=12), is_completed=False)
+    for number in range(3, 6):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+
+    assert client.get("/fights/ongoing").json()["id"] == "fight-2"
+    assert client.get("/fights/ready").json()["id"] == "fight-3"
+    assert [f["id"] for f in client.get("/fights/next?limit=2").json()] == ["fight-4", "fight-5"]
+    assert [f["id"] for f in client.get("/fights/past").json()] == ["fight-1"]
+
+    # Rows written behind the cache's back are not visible until it is invalidated
+    _add_fight(db_session, 6, is_completed=False)
+    db_session.commit()
+    assert len(client.get("/fights").json()) == 5
+    card_snapshot.invalidate()
+    assert len(client.get("/fights").json()) == 6
+
+def test_read_routes_answer_not_modified_for_matching_etag(client, db_session):
+    _add_fight(db_session, 1, is_completed=False)
+    db_session.commit()
+
+    response = client.get("/fights/ready")
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+
+    response = client.get("/fights/ready", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    # A committed mutation changes the payload, hence the ETag
+    client.delete("/fights")
+    response = client.get("/fights/ready", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() is None
+    assert response.headers["etag"] != etag
+
+def test_card_state_combines_all_views(client, db_session):
+    start = datetime(2026, 1, 1, 18, 0)
+    _add_fight(db_session, 1, actual_start=start, actual_end=start + timedelta(minutes=9),
+               is_completed=True)
+    for number in range(2, 6):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+
+    state = client.get("/fights/state?next_limit=2").json()
+    assert state["ongoing"] is None
+    assert state["ready"]["id"] == "fight-2"
+    assert [f["id"] for f in state["next"]] == ["fight-3", "fight-4"]
+    assert [f["id"] for f in state["past"]] == ["fight-1"]
+
+def _auth_headers():
+    import jwt
+    from app.utils.auth import JWT_SECRET
+
+    token = jwt.encode(
+        {"sub": "admin", "exp": datetime.utcnow() + timedelta(hours=1)},
+        JWT_SECRET,
+        algorithm="HS256"
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.mark.parametrize("route", ["delete", "cancel"])
+def test_removing_a_fight_costs_constant_statements(client, db_session, route):
+    from sqlalchemy import event
+    from tests.conftest import async_engine
+    engine = async_engine.sync_engine
+
+    def statements_to_remove_second_fight(nb_fights):
+        db_session.query(Fight).delete()
+        for number in range(1, nb_fights + 1):
+            _add_fight(db_session, number, is_completed=False)
+        db_session.commit()
+
+        statements = []
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            if route == "delete":
+                response = client.delete("/fights/fight-2", headers=_auth_headers())
+            else:
+                response = client.post("/fights/fight-2/cancel", headers=_auth_headers())
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        assert response.status_code == 200
+        return len(statements)
+
+    assert statements_to_remove_second_fight(5) == statements_to_remove_second_fight(40)
+    numbers = [number for (number,) in db_session.query(Fight.fight_number).order_by(Fight.fight_number)]
+    assert numbers == list(range(1, 40))
+
+def test_import_reports_invalid_rows(client):
+    csv_content = """fighter_a,fighter_a_club,fighter_b,fighter_b_club,weight_class,round_duration,nb_rounds,rest_time,fight_type
+John Doe,Club A,Jane Smith,Club B,75,2,3,1,Muay Thai
+Bad Rounds,Club A,Other,Club B,75,2,12,1,Muay Thai
+Max Power,Club C,Rick Roll,Club D,81,3,3,1,K1"""
+
+    response = client.post(
+        "/fights/import",
+        files={"file": ("fights.csv", csv_content.encode(), "text/csv")}
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["rejected"] == 1
+    assert report["errors"][0]["row"] == 3
+    assert report["errors"][0]["error"].startswith("nb_rounds:")
+
+    fights = client.get("/fights").json()
+    assert [f["fight_number"] for f in fights] == [1, 2]
+    assert fights[1]["fighter_a"] == "Max Power"
+
+def test_import_streams_in_chunks(db_session):
+    import io
+    from app.utils.importer import import_csv
+
+    lines = ["fighter_a,fighter_a_club,fighter_b,fighter_b_club,weight_class,round_duration,nb_rounds,rest_time,fight_type"]
+    lines += [f"A{i},Club A,B{i},Club B,70,2,3,1,Muay Thai" for i in range(25)]
+    report = import_csv(db_session, io.StringIO("\n".join(lines)), datetime(2026, 1, 1, 18, 0), 1, chunk_size=10)
+    db_session.commit()
+
+    assert report.imported == 25
+    assert db_session.query(Fight).count() == 25
+    last = db_session.query(Fight).filter(Fight.fight_number == 25).one()
+    assert last.expected_start == datetime(2026, 1, 1, 18, 0) + timedelta(minutes=24 * 10)
+
+def test_upload_is_decoded_from_a_file_with_only_read():
+    import csv
+    import io
+    from app.utils.importer import open_upload
+
+    # SpooledTemporaryFile has no readable() before Python 3.11
+    class Upload:
+        def __init__(self, data):
+            self._data = io.BytesIO(data)
+
+        def read(self, size=-1):
+            return self._data.read(size)
+
+    upload = Upload('\ufefffighter_a,fighter_b\n"Élodie\nB",Zoé\n'.encode("utf-8"))
+    rows = list(csv.DictReader(open_upload(upload)))
+    assert rows == [{"fighter_a": "Élodie\nB", "fighter_b": "Zoé"}]
+
+def _new_fight_payload(**kwargs):
+    return {
+        "fighter_a": "New A", "fighter_a_club": "Club A", "fighter_b": "New B", "fighter_b_club": "Club B",
+        "weight_class": 60, "round_duration": 2, "nb_rounds": 3, "rest_time": 1, "fight_type": "K1",
+        **kwargs
+    }
+
+def test_batch_applies_operations_with_one_reschedule(client, db_session, monkeypatch):
+    from app.routers import fights as fights_router
+
+    for number in range(1, 7):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+
+    reschedules = []
+    real_reschedule = fights_router.reschedule_card
+    monkeypatch.setattr(fights_router, "reschedule_card", lambda *args: reschedules.append(1) or real_reschedule(*args))
+
+    response = client.post("/fights/batch", headers=_auth_headers(), json={"operations": [
+        {"op": "move", "fight_id": "fight-6", "new_number": 3},
+        {"op": "patch", "fight_id": "fight-4", "changes": {"nb_rounds": 5}},
+        {"op": "cancel", "fight_id": "fight-5"},
+        {"op": "add", "fight": _new_fight_payload(position=4)},
+        {"op": "delete", "fight_id": "fight-3"},
+    ]})
+    assert response.status_code == 200
+    assert len(reschedules) == 1
+
+    diff = response.json()
+    assert diff["version"] == card_snapshot.version
+    assert sorted(diff["removed"]) == ["fight-3", "fight-5"]
+    # Fights 1 and 2 keep their number and time
+    assert {f["id"] for f in diff["changed"]} >= {"fight-4", "fight-6"}
+    assert {"fight-1", "fight-2"}.isdisjoint(f["id"] for f in diff["changed"])
+
+    card = sorted(client.get("/fights").json(), key=lambda f: f["fight_number"])
+    assert card[3]["fighter_a"] == "New A"
+    assert [f["id"] for f in card[:3] + card[4:]] == ["fight-1", "fight-2", "fight-6", "fight-4"]
+    assert [f["fight_number"] for f in card] == [1, 2, 3, 4, 5]
+    starts = [datetime.fromisoformat(f["expected_start"]).replace(tzinfo=None) for f in card]
+    assert starts[4] - starts[3] == timedelta(minutes=10)
+    assert starts[3] - starts[2] == timedelta(minutes=10)
+    changed = {f["id"]: f for f in diff["changed"]}
+    assert changed["fight-4"]["nb_rounds"] == 5
+
+def test_batch_is_all_or_nothing(client, db_session):
+    for number in range(1, 5):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+    version = card_snapshot.version
+
+    response = client.post("/fights/batch", headers=_auth_headers(), json={"operations": [
+        {"op": "delete", "fight_id": "fight-4"},
+        {"op": "move", "fight_id": "fight-3", "new_number": 1},
+    ]})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Operation 1 (move): Cannot move fight before position")
+    assert card_snapshot.version == version
+
+    db_session.expire_all()
+    numbers = [number for (number,) in db_session.query(Fight.fight_number).order_by(Fight.fight_number)]
+    assert numbers == [1, 2, 3, 4]
+
+def test_batch_moves_see_the_previous_moves(client, db_session):
+    for number in range(1, 9):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+
+    response = client.post("/fights/batch", headers=_auth_headers(), json={"operations": [
+        {"op": "move", "fight_id": "fight-4", "new_number": 6},
+        {"op": "move", "fight_id": "fight-6", "new_number": 4},
+        {"op": "move", "fight_id": "fight-6", "new_number": 6},
+        {"op": "move", "fight_id": "fight-8", "new_number": 3},
+    ]})
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    card = db_session.query(Fight.id, Fight.fight_number).order_by(Fight.fight_number).all()
+    assert [number for _, number in card] == list(range(1, 9))
+    assert [fight_id[len("fight-"):] for fight_id, _ in card] == ["1", "2", "8", "3", "5", "4", "6", "7"]
+
+def test_renumber_delta_returns_only_moved_fights(client, db_session):
+    for number in range(1, 9):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+
+    response = client.patch("/fights/fight-6/number/4?delta=true", headers=_auth_headers())
+    assert response.status_code == 200
+    diff = response.json()
+    assert diff["version"] == card_snapshot.version
+    assert diff["removed"] == []
+    # Fights 4 to 6 swap places, the others keep their number and time
+    assert [(f["id"], f["fight_number"]) for f in diff["changed"]] == [
+        ("fight-6", 4), ("fight-4", 5), ("fight-5", 6)
+    ]
+
+    # The header works too, and the full card is still the default
+    response = client.patch("/fights/fight-6/number/6", headers={**_auth_headers(), "X-Card-Delta": "true"})
+    assert len(response.json()["changed"]) == 3
+    response = client.patch("/fights/fight-6/number/4", headers=_auth_headers())
+    assert len(response.json()) == 8
+
+def test_refresh_times_delta(client, db_session):
+    fights = [_add_fight(db_session, number, is_completed=False) for number in range(1, 5)]
+    fights[2].expected_start = datetime(2026, 1, 1, 23, 0)
+    db_session.commit()
+
+    response = client.post("/fights/refresh-times", headers={**_auth_headers(), "X-Card-Delta": "1"})
+    assert response.status_code == 200
+    changed = response.json()["changed"]
+    assert [f["id"] for f in changed] == ["fight-3"]
+    assert changed[0]["expected_start"].startswith("2026-01-01T18:30:00")
+
+def test_card_event_broker_filters_by_ring():
+    import asyncio
+    from app.utils.events import CardEventBroker
+
+    async def scenario():
+        broker = CardEventBroker()
+        ring_2 = broker.subscribe(("default", "2"))
+        everything = broker.subscribe()
+        broker.publish("fight_started", partition=("default", "1"))
+        return ring_2.empty(), everything.get_nowait()
+
+    ring_2_empty, event = asyncio.run(scenario())
+    assert ring_2_empty
+    assert event == {"version": 1, "reason": "fight_started", "event_id": "default", "ring_id": "1"}
+
+def test_rings_are_scheduled_independently(client, db_session):
+    for number in range(1, 4):
+        _add_fight(db_session, number, is_completed=False)
+        _add_fight(db_session, number, id=f"ring2-{number}", ring_id="2", is_completed=False)
+    db_session.commit()
+    ring_1 = client.get("/fights").json()
+    assert [f["id"] for f in ring_1] == ["fight-1", "fight-2", "fight-3"]
+
+    # Starting a fight in ring 2 neither blocks nor reschedules ring 1
+    assert client.post("/fights/ring2-1/start?ring_id=2").status_code == 200
+    assert client.post("/fights/fight-1/start").status_code == 200
+    ring_2 = client.get("/fights", params={"ring_id": "2"}).json()
+    assert [f["id"] for f in ring_2] == ["ring2-1", "ring2-2", "ring2-3"]
+    assert all(f["ring_id"] == "2" for f in ring_2)
+    assert client.get("/fights/ongoing", params={"ring_id": "2"}).json()["id"] == "ring2-1"
+
+    # Numbering is per ring: an insertion in ring 2 leaves ring 1 alone
+    response = client.post("/fights/add?ring_id=2", json=_new_fight_payload(), headers=_auth_headers())
+    assert response.status_code == 200
+    assert (response.json()["ring_id"], response.json()["fight_number"]) == ("2", 3)
+    numbers = {f["id"]: f["fight_number"] for f in client.get("/fights").json()}
+    assert numbers == {"fight-1": 1, "fight-2": 2, "fight-3": 3}
+
+    # A fight of another ring is not found
+    assert client.delete("/fights/fight-2?ring_id=2", headers=_auth_headers()).status_code == 404
+
+def test_list_fights_pages_and_projects(client, db_session):
+    for number in range(1, 6):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+
+    response = client.get("/fights", params={"limit": 2, "fields": "fighter_a,expected_start"})
+    assert response.status_code == 200
+    assert response.json()[0] == {
+        "id": "fight-1", "fight_number": 1, "fighter_a": "Fighter A", "expected_start": "2026-01-01T18:10:00+01:00",
+    }
+    pages = [[f["id"] for f in response.json()]]
+    while "X-Next-Cursor" in response.headers:
+        response = client.get("/fights", params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]})
+        pages.append([f["id"] for f in response.json()])
+    assert pages == [["fight-1", "fight-2"], ["fight-3", "fight-4"], ["fight-5"]]
+    # Without fields, a page holds whole fights
+    assert response.json()[0]["duration"] == 8
+
+    assert client.get("/fights", params={"fields": "fighter_a,password"}).status_code == 400
@@ -0,0 +1,49 @@
+import math
+import statistics
+from datetime import datetime, timedelta
+
+from app.utils.forecast import Z_90, RunningStats
+from tests.test_fights import _add_fight
+
+def test_running_stats_match_batch_statistics():
+    values = [1.5, 3.0, -0.5, 2.25, 7.0, 4.0]
+    left, right = RunningStats(), RunningStats()
+    for value in values[:2]:
+        left.add(value)
+    for value in values[2:]:
+        right.add(value)
+
+    merged = left.merge(right)
+    assert merged.count == len(values)
+    assert math.isclose(merged.mean, statistics.mean(values))
+    assert math.isclose(merged.variance, statistics.variance(values))
+    assert RunningStats().merge(RunningStats()).count == 0
+
+def test_forecast_learns_overruns_and_changeovers(client, db_session):
+    # Four Muay Thai fights of 8 minutes lasting 9, 10, 11 and 10, with 5 minute changeovers
+    start = datetime(2026, 1, 1, 18, 0)
+    for number, length in enumerate([9, 10, 11, 10], start=1):
+        _add_fight(db_session, number, actual_start=start, actual_end=start + timedelta(minutes=length),
+                   is_completed=True)
+        start += timedelta(minutes=length + 5)
+    # The rest of the card is scheduled far ahead, so it starts as scheduled
+    scheduled = datetime(2099, 1, 1, 18, 0)
+    for number in range(5, 8):
+        _add_fight(db_session, number, is_completed=False, expected_start=scheduled)
+    db_session.commit()
+
+    response = client.get("/fights/forecast")
+    assert response.status_code == 200
+    forecast = response.json()
+    stats = forecast["stats"][0]
+    assert (stats["fight_type"], stats["overrun_samples"], stats["changeover_samples"]) == ("Muay Thai", 4, 3)
+    assert math.isclose(stats["overrun_mean"], 2) and math.isclose(stats["changeover_mean"], 5)
+
+    starts = [datetime.fromisoformat(f["expected_start"]) for f in forecast["fights"]]
+    p90_starts = [datetime.fromisoformat(f["p90_start"]) for f in forecast["fights"]]
+    assert [f["id"] for f in forecast["fights"]] == ["fight-5", "fight-6", "fight-7"]
+    # Each fight takes 8 + 2 minutes, then 5 minutes of changeover
+    assert [(s - starts[0]) / timedelta(minutes=1) for s in starts] == [0, 15, 30]
+    assert p90_starts[0] == starts[0]
+    spread = (p90_starts[1] - starts[1]) / timedelta(minutes=1)
+    assert math.isclose(spread, Z_90 * math.sqrt(statistics.variance([1, 2, 3, 2])), rel_tol=1e-4)
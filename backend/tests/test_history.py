@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from app.models.fight import Fight
+from app.models.history import FightHistory
+from tests.test_fights import _add_fight, _auth_headers
+
+START = datetime(2026, 1, 1, 18, 0)
+
+def _add_completed_fight(db_session, fight_number, ended_after, **kwargs):
+    return _add_fight(
+        db_session,
+        fight_number,
+        actual_start=START + timedelta(minutes=10 * fight_number),
+        actual_end=START + timedelta(minutes=ended_after),
+        is_completed=True,
+        **kwargs
+    )
+
+def test_archive_moves_a_finished_ring_to_history(client, db_session):
+    for number in range(1, 4):
+        _add_completed_fight(db_session, number, 10 * number + 9)
+    _add_fight(db_session, 1, id="ring2-1", ring_id="2", is_completed=False)
+    db_session.commit()
+
+    response = client.post("/fights/archive", headers=_auth_headers())
+    assert response.status_code == 200
+    assert response.json() == {"archived": 3}
+
+    # The ring leaves the live table, the other ring stays
+    assert client.get("/fights").json() == []
+    assert client.get("/fights/past").json() == []
+    assert [f.id for f in db_session.query(Fight).all()] == ["ring2-1"]
+    record = db_session.get(FightHistory, "fight-1")
+    assert (record.ring_id, record.duration, record.actual_end) == ("1", 8, START + timedelta(minutes=19))
+
+    # A ring with fights to come can't be archived
+    response = client.post("/fights/archive?ring_id=2", headers=_auth_headers())
+    assert response.status_code == 400
+    assert db_session.query(FightHistory).count() == 3
+
+def test_history_keyset_pagination(client, db_session):
+    # Fights 3 and 4 end at the same time, the id breaks the tie
+    for number, ended_after in [(1, 9), (2, 19), (3, 29), (4, 29), (5, 39)]:
+        _add_completed_fight(db_session, number, ended_after)
+    db_session.commit()
+    assert client.post("/fights/archive", headers=_auth_headers()).json() == {"archived": 5}
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/history", params=params).json()
+        seen.append([f["id"] for f in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [["fight-5", "fight-4"], ["fight-3", "fight-2"], ["fight-1"]]
+    assert client.get("/history", params={"ring_id": "2"}).json() == {"items": [], "next_cursor": None}
+    assert client.get("/history", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,69 @@
+import re
+
+from app.utils.snapshot import card_snapshot
+from tests.test_fights import _add_fight
+
+def _timing(response):
+    timing = response.headers["server-timing"]
+    queries = int(re.search(r'db;dur=[0-9.]+;desc="(\d+) queries"', timing).group(1))
+    durations = dict(re.findall(r"(\w+);dur=([0-9.]+)", timing))
+    return queries, {name: float(value) for name, value in durations.items()}
+
+def test_server_timing_counts_the_queries_of_each_request(client, db_session):
+    for number in range(1, 4):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+    card_snapshot.invalidate()
+
+    # The first read builds the snapshot, the next one is served from it
+    queries, durations = _timing(client.get("/fights/ready"))
+    assert queries >= 1
+    assert durations["total"] >= durations["db"]
+    assert "ser" in durations
+    queries, _ = _timing(client.get("/fights/ready"))
+    assert queries == 0
+
+    queries, _ = _timing(client.post("/fights/fight-1/start"))
+    assert queries >= 2
+
+def test_metrics_are_totalled_per_route(client, db_session):
+    _add_fight(db_session, 1, is_completed=False)
+    db_session.commit()
+
+    client.post("/fights/fight-1/start")
+    client.get("/nothing-here")
+    routes = client.get("/health/requests").json()["routes"]
+
+    started = routes["POST /fights/{fight_id}/start"]
+    assert started["count"] >= 1
+    assert started["queries_per_request"] > 0
+    assert started["mean_ms"] >= started["sql_mean_ms"]
+    # Paths that match no route share one entry
+    assert routes["GET (unmatched)"]["count"] >= 1
+    assert not any("nothing-here" in name for name in routes)
+
+def test_event_streams_stay_out_of_latency_and_in_flight():
+    import asyncio
+    from app.utils.instrumentation import RequestMetricsMiddleware, RequestMetricsRegistry
+    from app.utils.metrics import http_request_duration, http_requests_in_flight
+
+    in_flight_during_stream = []
+
+    async def feed(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/event-stream; charset=utf-8")]})
+        in_flight_during_stream.append(http_requests_in_flight._values.get((), 0))
+        await send({"type": "http.response.body", "body": b"retry: 3000\n\n"})
+
+    async def send(message):
+        pass
+
+    registry = RequestMetricsRegistry()
+    in_flight = http_requests_in_flight._values.get((), 0)
+    observed = http_request_duration.samples()
+    asyncio.run(RequestMetricsMiddleware(feed, registry)({"type": "http", "method": "GET", "headers": []}, None, send))
+
+    assert in_flight_during_stream == [in_flight]
+    assert http_requests_in_flight._values.get((), 0) == in_flight
+    assert http_request_duration.samples() == observed
+    assert registry.snapshot() == {}
@@ -0,0 +1,81 @@
+import json
+import os
+import re
+
+from app.utils.metrics import MetricsExporter, MetricsRegistry
+from tests.test_fights import _add_fight
+
+def _sample(text, name, **labels):
+    """Value of a sample in the text exposition, None when it is missing"""
+    for line in text.splitlines():
+        match = re.fullmatch(rf"{re.escape(name)}(?:\{{(.*)\}})? (\S+)", line)
+        if match and dict(re.findall(r'(\w+)="([^"]*)"', match.group(1) or "")) == labels:
+            return float(match.group(2))
+    return None
+
+def test_registry_renders_the_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    in_flight = registry.gauge("in_flight", "In flight")
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    requests.inc("/a")
+    requests.inc("/a", amount=2)
+    in_flight.inc()
+    latency.observe(0.05, "/a")
+    latency.observe(0.5, "/a")
+    latency.observe(3, "/a")
+
+    text = registry.render(registry.merge([registry.collect()]))
+    assert "# TYPE requests_total counter" in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert _sample(text, "requests_total", route="/a") == 3
+    assert _sample(text, "in_flight") == 1
+    # Buckets are cumulative, +Inf holds every observation
+    assert _sample(text, "latency_seconds_bucket", route="/a", le="0.1") == 1
+    assert _sample(text, "latency_seconds_bucket", route="/a", le="1") == 2
+    assert _sample(text, "latency_seconds_bucket", route="/a", le="+Inf") == 3
+    assert _sample(text, "latency_seconds_count", route="/a") == 3
+    assert _sample(text, "latency_seconds_sum", route="/a") == 3.55
+
+def test_exporter_adds_up_the_live_workers(tmp_path):
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(1.0,))
+    requests.inc("/a")
+    latency.observe(0.5)
+    exporter = MetricsExporter(registry, str(tmp_path))
+
+    # Another live worker (the parent process stands for it), and one that is gone
+    other = {"requests_total": [[["/a"], 2], [["/b"], 1]], "latency_seconds": [[[], [0, 1, 2.0]]]}
+    (tmp_path / f"worker-{os.getppid()}.json").write_text(json.dumps(other))
+    gone = tmp_path / "worker-999999999.json"
+    gone.write_text(json.dumps(other))
+
+    text = exporter.render()
+    assert _sample(text, "requests_total", route="/a") == 3
+    assert _sample(text, "requests_total", route="/b") == 1
+    assert _sample(text, "latency_seconds_bucket", le="1") == 1
+    assert _sample(text, "latency_seconds_count") == 2
+    assert _sample(text, "latency_seconds_sum") == 2.5
+    assert not gone.exists()
+    assert (tmp_path / f"worker-{os.getpid()}.json").exists()
+
+def test_metrics_endpoint(client, db_session):
+    for number in range(1, 4):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+    client.get("/fights")
+    client.post("/fights/fight-1/start")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert _sample(text, "interclub_http_requests_total", method="GET", route="/fights", status="200") >= 1
+    assert _sample(text, "interclub_http_request_duration_seconds_count", method="GET", route="/fights") >= 1
+    assert _sample(text, "interclub_http_request_sql_queries_total", method="POST", route="/fights/{fight_id}/start") >= 2
+    # The /metrics request itself is in flight
+    assert _sample(text, "interclub_http_requests_in_flight") >= 1
+    assert _sample(text, "interclub_rescheduled_rows_count") >= 1
+    assert _sample(text, "interclub_live_feed_clients") is not None
+    assert _sample(text, "interclub_db_pool_checkouts_total", pool="async") is not None
@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import os
+
+from app.models.fight import DEFAULT_PARTITION, CardPartition
+from app.utils.publisher import StatePublisher, state_path, write_state_files
+from tests.test_fights import _add_fight
+
+def test_state_files_are_replaced_whole(tmp_path):
+    path = str(tmp_path / "public" / "state.json")
+    write_state_files(path, b'{"old":true}')
+    write_state_files(path, b'{"ongoing":null}')
+
+    with open(path, "rb") as file:
+        assert file.read() == b'{"ongoing":null}'
+    with open(path + ".gz", "rb") as file:
+        assert gzip.decompress(file.read()) == b'{"ongoing":null}'
+    # No temporary file is left behind
+    assert not [name for name in os.listdir(tmp_path / "public") if name.startswith(".")]
+
+def test_state_path_per_ring(tmp_path):
+    assert state_path(str(tmp_path), DEFAULT_PARTITION) == str(tmp_path / "state.json")
+    assert state_path(str(tmp_path), CardPartition("gala", "2")) == str(tmp_path / "gala" / "2" / "state.json")
+    assert state_path(str(tmp_path), CardPartition("..", "2")) is None
+    assert state_path(str(tmp_path), CardPartition("gala", "../2")) is None
+
+def test_older_state_never_replaces_a_newer_one(tmp_path):
+    path = str(tmp_path / "state.json")
+    assert write_state_files(path, b'{"version":2}', read_at=200.0)
+    # A slower worker finishing last with a state it read earlier
+    assert not write_state_files(path, b'{"version":1}', read_at=100.0)
+    assert write_state_files(path, b'{"version":3}', read_at=300.0)
+
+    with open(path, "rb") as file:
+        assert file.read() == b'{"version":3}'
+
+def _wait_for(condition):
+    async def wait():
+        for _ in range(100):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+    return wait()
+
+def test_publisher_writes_the_state_route_payload(client, db_session, async_session_factory, tmp_path):
+    for number in range(1, 4):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+    publisher = StatePublisher(str(tmp_path), async_session_factory, next_limit=5, past_limit=10)
+    gala_state = tmp_path / "gala" / "2" / "state.json"
+
+    async def scenario():
+        publisher.start()
+        try:
+            await _wait_for(lambda: os.path.exists(tmp_path / "state.json"))
+            # A change this worker made to ring 2 is published next to the default ring
+            publisher.notify(CardPartition("gala", "2"))
+            await _wait_for(gala_state.exists)
+        finally:
+            await publisher.stop()
+
+    asyncio.run(scenario())
+    with open(tmp_path / "state.json", "rb") as file:
+        assert file.read() == client.get("/fights/state").content
+    with open(gala_state, "rb") as file:
+        assert file.read() == b'{"ongoing":null,"ready":null,"next":[],"past":[]}'
+    # The default ring is also written under its own ids
+    with open(tmp_path / DEFAULT_PARTITION.event_id / DEFAULT_PARTITION.ring_id / "state.json", "rb") as file:
+        assert file.read() == client.get("/fights/state").content
+
+def test_start_publishes_every_ring(db_session, async_session_factory, tmp_path):
+    gala = CardPartition("gala", "2")
+    _add_fight(db_session, 1, event_id=gala.event_id, ring_id=gala.ring_id, is_completed=False)
+    db_session.commit()
+    publisher = StatePublisher(str(tmp_path), async_session_factory, next_limit=5, past_limit=10)
+    gala_state = tmp_path / "gala" / "2" / "state.json"
+
+    async def scenario():
+        publisher.start()
+        try:
+            await _wait_for(lambda: gala_state.exists() and os.path.exists(tmp_path / "state.json"))
+        finally:
+            await publisher.stop()
+
+    asyncio.run(scenario())
+    with open(gala_state, "rb") as file:
+        assert b'"ready":{' in file.read()
+
+def test_only_the_committing_worker_publishes(client, monkeypatch):
+    from app.routers import fights as fights_router
+    from app.utils.fanout import card_fanout
+
+    notified = []
+
+    class Publisher:
+        def notify(self, partition):
+            notified.append(partition)
+
+    monkeypatch.setattr(fights_router, "state_publisher", Publisher())
+    client.delete("/fights?ring_id=3")
+    # A change fanned out from another worker is not published here
+    card_fanout.receive('{"origin":"other:1","reason":"fight_started","version":99,"event_id":"default","ring_id":"4"}')
+    assert notified == [CardPartition(DEFAULT_PARTITION.event_id, "3")]
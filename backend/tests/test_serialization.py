@@ -0,0 +1,58 @@
+import json
+from datetime import datetime
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.models.fight import Fight
+from app.schemas.fight import Fight as FightSchema
+from app.utils import serialization
+from app.utils.serialization import dump_fights, dump_partial_fights, fight_json
+
+def _fights():
+    common = dict(fighter_a="Fighter A", fighter_a_club="Club A", fighter_b="Fighter B", fighter_b_club="Club B",
+                  weight_class=70, fight_type="Muay Thai", event_id="default", ring_id="1")
+    return [
+        # Winter and summer time, completed, ongoing and pending fights
+        Fight(id="fight-1", fight_number=1, round_duration=2.0, nb_rounds=3, rest_time=1.0,
+              expected_start=datetime(2026, 1, 10, 18, 0), actual_start=datetime(2026, 1, 10, 18, 1),
+              actual_end=datetime(2026, 1, 10, 18, 9, 30, 125000), is_completed=True, **common),
+        Fight(id="fight-2", fight_number=2, round_duration=1.5, nb_rounds=5, rest_time=0.5,
+              expected_start=datetime(2026, 7, 10, 18, 12), actual_start=datetime(2026, 7, 10, 18, 12),
+              actual_end=None, is_completed=False, **common),
+        Fight(id="fight-3", fight_number=3, round_duration=3.0, nb_rounds=1, rest_time=0.0,
+              expected_start=datetime(2026, 7, 10, 18, 30), actual_start=None, actual_end=None,
+              is_completed=False, **common),
+    ]
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_serialization_matches_fight_schema(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    fights = _fights()
+    expected = TypeAdapter(List[FightSchema]).dump_python(
+        [FightSchema.model_validate(fight) for fight in fights], mode="json"
+    )
+    assert json.loads(dump_fights(fights)) == expected
+    assert [json.loads(fight_json(fight)) for fight in fights] == expected
+    assert expected[1]["expected_start"] == "2026-07-10T18:12:00+02:00"
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_partial_fights_match_fight_schema(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    fields = ["id", "fighter_a", "actual_end", "duration"]
+    fights = _fights()
+    rows = [tuple(getattr(fight, field) for field in fields) for fight in fights]
+    expected = [
+        {field: FightSchema.model_validate(fight).model_dump(mode="json")[field] for field in fields}
+        for fight in fights
+    ]
+    assert json.loads(dump_partial_fights(fields, rows)) == expected
@@ -0,0 +1,50 @@
+import asyncio
+
+from app.models.fight import DEFAULT_PARTITION, CardPartition
+from app.utils import snapshot as snapshot_module
+from app.utils.snapshot import CardSnapshotCache
+from tests.test_fights import _add_fight
+
+def test_concurrent_readers_share_one_rebuild(db_session, async_session_factory, monkeypatch):
+    for number in range(1, 4):
+        _add_fight(db_session, number, is_completed=False)
+    db_session.commit()
+    cache = CardSnapshotCache()
+    builds = []
+    real_snapshot = snapshot_module.CardSnapshot
+    monkeypatch.setattr(snapshot_module, "CardSnapshot", lambda *args: builds.append(1) or real_snapshot(*args))
+
+    async def read():
+        async with async_session_factory() as db:
+            return await cache.get(db)
+
+    async def scenario():
+        first = await asyncio.gather(*(read() for _ in range(10)))
+        cache.invalidate(DEFAULT_PARTITION)
+        second = await asyncio.gather(*(read() for _ in range(10)))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert len(builds) == 2
+    assert len({id(snapshot) for snapshot in first}) == len({id(snapshot) for snapshot in second}) == 1
+    assert second[0].version > first[0].version
+
+def test_snapshot_read_before_a_resync_is_not_kept(db_session, async_session_factory):
+    _add_fight(db_session, 1, is_completed=False)
+    db_session.commit()
+    cache = CardSnapshotCache()
+    gala = CardPartition("gala", "2")
+
+    async def scenario():
+        async with async_session_factory() as db:
+            await cache.get(db, gala)
+            reading = asyncio.ensure_future(cache.get(db))
+            # The resync lands while the default ring is being read
+            await asyncio.sleep(0)
+            cache.invalidate()
+            stale = await reading
+            return stale, await cache.get(db), await cache.get(db, gala)
+
+    stale, fresh, gala_snapshot = asyncio.run(scenario())
+    assert fresh is not stale
+    assert fresh.version == gala_snapshot.version == cache.version
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from app.models.fight import Fight
+from app.utils.time import compute_start_times, reschedule_card
+
+
+def _fight(number, nb_rounds=3, **kwargs):
+    return Fight(
+        id=f"fight-{number}",
+        fight_number=number,
+        fighter_a="Fighter A",
+        fighter_a_club="Club A",
+        fighter_b="Fighter B",
+        fighter_b_club="Club B",
+        weight_class=70,
+        round_duration=2,
+        nb_rounds=nb_rounds,
+        rest_time=1,
+        fight_type="Muay Thai",
+        is_completed=False,
+        **kwargs
+    )
+
+
+def test_compute_start_times_is_a_prefix_sum():
+    anchor = datetime(2026, 1, 1, 18, 0)
+    assert compute_start_times([], anchor) == []
+    assert compute_start_times([8, 5, 8], anchor, buffer_minutes=2) == [
+        anchor,
+        anchor + timedelta(minutes=10),
+        anchor + timedelta(minutes=17),
+    ]
+
+
+def test_reschedule_only_writes_changed_rows(db_session):
+    anchor = datetime(2026, 1, 1, 18, 0)
+    starts = compute_start_times([8] * 4, anchor)
+    for number, start in enumerate(starts, start=1):
+        db_session.add(_fight(number, expected_start=start))
+    db_session.commit()
+
+    # Nothing moved: nothing is written
+    assert reschedule_card(db_session) == {}
+
+    # A longer third fight only shifts the fight after it
+    db_session.get(Fight, "fight-3").nb_rounds = 4
+    changes = reschedule_card(db_session)
+    db_session.commit()
+    assert changes == {"fight-4": starts[3] + timedelta(minutes=3)}
+
+
+def test_reschedule_follows_the_ongoing_fight(db_session):
+    started = datetime(2026, 1, 1, 18, 0)
+    db_session.add(_fight(1, expected_start=started, actual_start=started))
+    db_session.add(_fight(2, expected_start=started))
+    db_session.commit()
+
+    changes = reschedule_card(db_session)
+    # 3 rounds of 2 minutes, 2 rests of 1 minute, plus the buffer
+    assert changes == {"fight-2": started + timedelta(minutes=10)}
+
+
+def test_duration_column_follows_its_components(db_session):
+    fight = _fight(1, expected_start=datetime(2026, 1, 1, 18, 0))
+    assert fight.duration == 8
+    db_session.add(fight)
+    db_session.commit()
+
+    fight.rest_time = 2
+    db_session.commit()
+    assert db_session.query(Fight.duration).scalar() == 10